@@ -0,0 +1,158 @@
+"""
+Memory benchmark comparing the legacy nested research_data dicts with SourceStore.
+
+Simulates a batch run of a few hundred sources where queries overlap (the same
+URL is returned by several queries) and some pages serve identical bodies,
+then measures retained memory and the time taken to assemble the synthesis
+context. Both sides assemble the same deduplicated context, and bodies the
+store spills to its memory-mapped file are reported next to the in-heap
+figures. No network or API access is needed.
+
+Usage:
+    python benchmarks/bench_source_store.py [--sources 400] [--queries 60] [--results 10]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# gemini_research validates its API keys at import time; the benchmark never calls the APIs
+for key in ("GOOGLE_API_KEY", "GOOGLE_SEARCH_API_KEY", "GOOGLE_CSE_ID"):
+    os.environ.setdefault(key, "benchmark")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gemini_research import SourceStore  # noqa: E402
+
+WORDS = ("quantum", "research", "analysis", "network", "protocol", "system", "results",
+         "model", "energy", "latency", "design", "security", "policy", "data", "market")
+
+def make_corpus(num_sources: int, num_queries: int, results_per_query: int, seed: int = 7):
+    """Generates synthetic (query, [result, ...]) pairs plus page bodies keyed by URL."""
+    rng = random.Random(seed)
+    bodies = {}
+    mirrored = []
+    for i in range(num_sources):
+        url = f"https://example{i % 40}.org/article/{i}"
+        if mirrored and rng.random() < 0.1:
+            bodies[url] = rng.choice(mirrored)  # syndicated copy of another page
+        else:
+            length = rng.randint(3000, 15000)
+            text = " ".join(rng.choice(WORDS) for _ in range(length // 7))[:length]
+            bodies[url] = text
+            mirrored.append(text)
+    urls = list(bodies)
+    queries = []
+    for q in range(num_queries):
+        results = []
+        for url in rng.sample(urls, min(results_per_query, len(urls))):
+            results.append({
+                "title": f"Title for {url}",
+                "link": url,
+                "snippet": "Snippet " + " ".join(rng.choice(WORDS) for _ in range(25)),
+                "date": "2024-05-01",
+            })
+        queries.append((f"query {q}", results))
+    return queries, bodies
+
+def build_legacy(queries, bodies):
+    """Builds the nested research_data list the way execute_research used to."""
+    research_data = []
+    for query, results in queries:
+        scraped = []
+        for result in results:
+            # Every scrape produced a fresh string, even for URLs seen under an earlier query
+            content = "".join(list(bodies[result["link"]]))
+            scraped.append({
+                "title": result["title"],
+                "url": result["link"],
+                "snippet": result["snippet"],
+                "content": content,
+                "error": "",
+                "date": result["date"],
+            })
+        research_data.append({"query": query, "search_results": [dict(r) for r in results], "scraped_content": scraped})
+    return research_data
+
+def legacy_context(topic, research_data):
+    """
+    The quadratic += context assembly synthesize_report used to perform, with each
+    URL emitted once under its first query so the output matches SourceStore's.
+    """
+    context = f"# Research Topic: {topic}\n\n"
+    source_count = 0
+    emitted = set()
+    for query_data in research_data:
+        context += f"## Search Query: {query_data['query']}\n\n"
+        for item in query_data["scraped_content"]:
+            if item["content"] and item["url"] not in emitted:
+                emitted.add(item["url"])
+                source_count += 1
+                context += f"### Source {source_count}: {item['title']}\n"
+                context += f"URL: {item['url']}\n"
+                context += f"Date: {item['date']}\n\n"
+                if len(item["content"]) > 10000:
+                    context += item["content"][:10000] + "...\n\n"
+                else:
+                    context += item["content"] + "\n\n"
+    return context
+
+def build_store(queries, bodies):
+    """Builds a SourceStore the way execute_research now does."""
+    store = SourceStore()
+    for query, results in queries:
+        query_id = store.add_query(query)
+        for result in results:
+            record = store.add_search_result(query_id, result)
+            if not record.scraped:
+                store.set_content(record, "".join(list(bodies[result["link"]])), "", result["date"])
+    return store
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def measure(label, build, assemble, spilled_bytes=lambda data: 0):
+    """Reports retained heap, spill-file size and RSS growth after building, and the time to assemble the context."""
+    rss_before = current_rss()
+    tracemalloc.start()
+    data = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = current_rss()
+    start = time.perf_counter()
+    context = assemble(data)
+    elapsed = time.perf_counter() - start
+    rss = f"{(rss_after - rss_before) / 1e6:8.2f} MB" if rss_before is not None else "     n/a"
+    print(f"{label:<12} retained={retained / 1e6:8.2f} MB  spilled={spilled_bytes(data) / 1e6:8.2f} MB  "
+          f"peak={peak / 1e6:8.2f} MB  rss_growth={rss}  "
+          f"context={len(context) / 1e6:6.2f} MB  assembled in {elapsed * 1000:8.1f} ms")
+    return data, context
+
+def main():
+    parser = argparse.ArgumentParser(description="SourceStore memory benchmark")
+    parser.add_argument("--sources", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--results", type=int, default=10)
+    args = parser.parse_args()
+
+    queries, bodies = make_corpus(args.sources, args.queries, args.results)
+    print(f"Synthetic run: {args.queries} queries x {args.results} results over {args.sources} unique URLs\n")
+
+    _, legacy = measure("legacy", lambda: build_legacy(queries, bodies), lambda data: legacy_context("topic", data))
+    store, context = measure("SourceStore", lambda: build_store(queries, bodies), lambda data: data.build_context("topic"),
+                             spilled_bytes=lambda data: data.memory_stats()["spilled_bytes"])
+    try:
+        print(f"\nContexts identical: {legacy == context}")
+        print(f"SourceStore stats: {store.memory_stats()}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
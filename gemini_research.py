@@ -1,14 +1,31 @@
 import os
 import json
+import mmap
+import hashlib
+import math
+import tempfile
+import gzip
+import socket
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
 import time
 import argparse
+import threading
 import requests
-from typing import List, Dict, Any, Union, Optional
+import requests.adapters
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Union, Optional, Iterable, Iterator
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from markdownify import markdownify
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from newspaper import Article
+from newspaper import Config as NewspaperConfig
 from newspaper.article import ArticleException
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -34,15 +51,561 @@ if not search_api_key:
 if not google_cse_id:
     raise ValueError("GOOGLE_CSE_ID environment variable must be set")
 
+# Directory for caches and state persisted between runs
+CACHE_DIR = os.getenv("RESEARCH_CACHE_DIR", ".research_cache")
+
+# --- LLM Response Cache ---
+# With --llm-cache, byte-identical requests (same model, generation config and
+# prompt) are answered from a persistent SQLite cache, so re-runs during prompt
+# tuning or after a partial failure only pay for the calls that changed. It is
+# off by default: sampled stages such as query planning would otherwise repeat
+# the same answer on every run. Entries expire after a day by default.
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_responses.sqlite")
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_CACHE_TTL = 24 * 60 * 60
+
+class ResponseCache:
+    """
+    Persistent, size-bounded LRU cache of model responses.
+    
+    Args:
+        path: Path of the SQLite database file
+        max_bytes: Total response size above which least recently used entries are evicted
+        ttl: Seconds after which an entry is treated as missing (None for no expiry)
+    """
+    
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl: Optional[float] = LLM_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+    
+    @staticmethod
+    def key(namespace: str, model_name: str, generation_config: Dict[str, Any], prompt: str) -> str:
+        """Hashes everything that determines a response."""
+        payload = json.dumps([namespace, model_name, generation_config, prompt], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for a key, or None (counting a miss) if absent or expired."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT response, latency, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[1]
+        return row[0]
+    
+    def put(self, key: str, model_name: str, response: str, latency: float) -> None:
+        """Stores a response and evicts least recently used entries beyond max_bytes."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, model, response, size, latency, created, last_used) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, model_name, response, size, latency, now, now))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evict = []
+            for old_key, old_size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                if total <= self.max_bytes or old_key == key:
+                    break
+                evict.append((old_key,))
+                total -= old_size
+            conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counts, hit rate, saved model time and current size."""
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "entries": entries,
+                "bytes": size,
+            }
+
+# --- Model Router ---
+# Each pipeline stage is routed to an ordered chain of models. The router keeps
+# running latency and error statistics per model and moves models that keep
+# failing or running slow to the back of the chain until they recover.
+DEFAULT_MODEL_ROUTES = {
+    "queries": ["gemini-1.5-flash", "gemini-1.5-pro"],
+    "summary": ["gemini-1.5-flash", "gemini-1.5-pro"],
+    "outline": ["gemini-1.5-flash", "gemini-1.5-pro"],
+    "intro": ["gemini-1.5-pro", "gemini-1.5-flash"],
+    "sections": ["gemini-1.5-pro", "gemini-1.5-flash"],
+    "conclusion": ["gemini-1.5-pro", "gemini-1.5-flash"],
+    "report": ["gemini-1.5-pro", "gemini-1.5-flash"],
+    "brief": ["gemini-1.5-flash", "gemini-1.5-pro"],
+}
+
+# Seconds after which a call in each stage is abandoned and counted as slow
+STAGE_TIMEOUTS = {
+    "queries": 30,
+    "summary": 45,
+    "outline": 60,
+    "intro": 180,
+    "sections": 300,
+    "conclusion": 180,
+    "report": 600,
+    "brief": 60,
+}
+
+# Expected seconds per call in each stage, used for deadline planning until real timings are known
+STAGE_LATENCY_ESTIMATES = {
+    "queries": 5,
+    "summary": 8,
+    "outline": 10,
+    "intro": 40,
+    "sections": 60,
+    "conclusion": 40,
+    "report": 90,
+    "brief": 8,
+}
+
+MODEL_MIN_CALL_SECONDS = 3       # Calls are not started with less time than this before a deadline
+MODEL_STATS_ALPHA = 0.3          # Weight of the newest sample in the running averages
+MODEL_MIN_SAMPLES = 2            # Calls needed before a model can be marked unhealthy
+MODEL_MAX_ERROR_RATE = 0.5       # Running error rate above which a model is demoted
+MODEL_SLOW_FRACTION = 0.8        # Running latency above this fraction of the stage timeout is "slow"
+MODEL_UNHEALTHY_COOLDOWN = 120   # Seconds before a demoted model is tried first again
+
+class GeminiBackend:
+    """Model backend that calls the Gemini API."""
+    
+    def generate(self, model_name: str, prompt: str, generation_config: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=genai.GenerationConfig(**generation_config)
+        )
+        # The timeout is the call's whole budget: the SDK's own retries would run past it,
+        # and the router falls back to the next model instead
+        request_options = {"timeout": timeout, "retry": None} if timeout else None
+        response = model.generate_content(prompt, request_options=request_options)
+        return response.text
+    
+class FakeModelBackend:
+    """
+    Offline model backend for testing. Returns canned text without calling any API.
+    
+    Args:
+        latency: Seconds to sleep per call, or a dict of model name -> seconds
+        fail_models: Model names that always raise an error
+        responder: Optional callable (model_name, prompt) -> str overriding the canned responses
+    """
+    
+    def __init__(self, latency: Union[float, Dict[str, float]] = 0.0, fail_models: tuple = (), responder=None):
+        self.latency = latency
+        self.fail_models = set(fail_models)
+        self.responder = responder
+        self.calls = []
+    
+    def generate(self, model_name: str, prompt: str, generation_config: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        self.calls.append(model_name)
+        delay = self.latency.get(model_name, 0.0) if isinstance(self.latency, dict) else self.latency
+        if delay:
+            time.sleep(delay if not timeout else min(delay, timeout))
+            if timeout and delay > timeout:
+                raise TimeoutError(f"Fake model '{model_name}' exceeded {timeout}s")
+        if model_name in self.fail_models:
+            raise RuntimeError(f"Fake model '{model_name}' is configured to fail")
+        if self.responder is not None:
+            return self.responder(model_name, prompt)
+        
+        # Query planning prompts expect a Python list of strings
+        match = re.search(r'Generate exactly (\d+)', prompt)
+        if match and "Python list of strings" in prompt:
+            return json.dumps([f"fake query {i + 1}" for i in range(int(match.group(1)))])
+        first_line = prompt.strip().splitlines()[0] if prompt.strip() else ""
+        return f"## Fake response from {model_name}\n\n{first_line}"
+    
+class ModelStats:
+    """Running latency and error statistics for one model in one stage."""
+    
+    __slots__ = ("calls", "errors", "total_latency", "avg_latency", "error_rate", "last_failure")
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.avg_latency = 0.0
+        self.error_rate = 0.0
+        self.last_failure = 0.0
+    
+    def record(self, latency: float, failed: bool, slow: bool = False) -> None:
+        self.calls += 1
+        self.total_latency += latency
+        if self.calls == 1:
+            self.avg_latency = latency
+            self.error_rate = 1.0 if failed else 0.0
+        else:
+            self.avg_latency += MODEL_STATS_ALPHA * (latency - self.avg_latency)
+            self.error_rate += MODEL_STATS_ALPHA * ((1.0 if failed else 0.0) - self.error_rate)
+        if failed:
+            self.errors += 1
+        if failed or slow:
+            self.last_failure = time.time()
+
+class ModelRouter:
+    """
+    Routes generation requests for each pipeline stage through a fallback chain of models.
+    
+    Args:
+        routes: Mapping of stage name -> ordered list of model names
+        backend: Object with a generate(model_name, prompt, generation_config, timeout) method
+        timeouts: Mapping of stage name -> seconds before a call is abandoned
+        cache: Optional ResponseCache consulted before each model call
+    """
+    
+    def __init__(self, routes: Dict[str, List[str]], backend=None, timeouts: Optional[Dict[str, float]] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.routes = {stage: list(models) for stage, models in routes.items()}
+        self.backend = backend if backend is not None else GeminiBackend()
+        self.timeouts = dict(STAGE_TIMEOUTS if timeouts is None else timeouts)
+        self.cache = cache
+        self._stats = {}            # (model name, stage) -> ModelStats
+        self._stage_latency = {}
+        self._lock = threading.Lock()
+    
+    def primary_model(self, stage: str) -> str:
+        """Returns the first model configured for a stage."""
+        return self._route(stage)[0]
+    
+    def _route(self, stage: str) -> List[str]:
+        route = self.routes.get(stage)
+        if not route:
+            raise ValueError(f"No model route configured for stage '{stage}'. Configured stages: {', '.join(self.routes)}")
+        return route
+    
+    def _is_healthy(self, model_name: str, stage: str) -> bool:
+        # Latency is judged against the stage's own timeout, so stats are kept per stage
+        stats = self._stats.get((model_name, stage))
+        if stats is None or stats.calls < MODEL_MIN_SAMPLES:
+            return True
+        timeout = self.timeouts.get(stage)
+        slow = bool(timeout) and stats.avg_latency > timeout * MODEL_SLOW_FRACTION
+        if not slow and stats.error_rate <= MODEL_MAX_ERROR_RATE:
+            return True
+        # Give demoted models another chance after the cooldown
+        return time.time() - stats.last_failure > MODEL_UNHEALTHY_COOLDOWN
+    
+    def candidates(self, stage: str) -> List[str]:
+        """Returns the stage's models in the order they will be tried: healthy models first, route order otherwise."""
+        route = self._route(stage)
+        with self._lock:
+            healthy = [model for model in route if self._is_healthy(model, stage)]
+        return healthy + [model for model in route if model not in healthy]
+    
+    def generate(self, stage: str, prompt: str, generation_config: Dict[str, Any], deadline: Optional[float] = None) -> str:
+        """
+        Generates text for a pipeline stage, falling back along the stage's route on errors.
+        
+        Args:
+            stage: Pipeline stage name (e.g. 'queries', 'outline', 'sections')
+            prompt: The prompt text
+            generation_config: Generation parameters (temperature, top_p, max_output_tokens, ...)
+            deadline: Optional absolute time (time.time()) by which the call must finish
+            
+        Returns:
+            The generated text
+            
+        Raises:
+            The last model's exception if every model in the route fails, or
+            TimeoutError if the deadline leaves no time for a call
+        """
+        return self.generate_with_model(stage, prompt, generation_config, deadline)[0]
+    
+    def generate_with_model(self, stage: str, prompt: str, generation_config: Dict[str, Any],
+                            deadline: Optional[float] = None) -> tuple:
+        """Like generate, but returns (text, name of the model that answered)."""
+        last_error = None
+        for model_name in self.candidates(stage):
+            cache_key = None
+            if self.cache is not None:
+                cache_key = ResponseCache.key(type(self.backend).__name__, model_name, generation_config, prompt)
+                text = self.cache.get(cache_key)
+                if text is not None:
+                    return text, model_name
+            timeout = self._call_timeout(stage, deadline)
+            if deadline is not None and timeout < MODEL_MIN_CALL_SECONDS:
+                last_error = last_error or TimeoutError(f"No time left before the deadline for the {stage} stage")
+                break
+            start = time.time()
+            try:
+                text = self.backend.generate(model_name, prompt, generation_config, timeout=timeout)
+            except Exception as e:
+                self._record(model_name, stage, time.time() - start, failed=True)
+                print(f"[ModelRouter] {stage}: {model_name} failed ({type(e).__name__}: {e}). Trying next model.")
+                last_error = e
+                continue
+            latency = time.time() - start
+            self._record(model_name, stage, latency, failed=False)
+            if cache_key is not None:
+                self.cache.put(cache_key, model_name, text, latency)
+            return text, model_name
+        raise last_error
+    
+    def _call_timeout(self, stage: str, deadline: Optional[float]) -> Optional[float]:
+        """The stage timeout, shortened to the time left before the deadline."""
+        timeout = self.timeouts.get(stage)
+        if deadline is not None:
+            remaining = deadline - time.time()
+            timeout = min(timeout, remaining) if timeout else remaining
+        return timeout
+    
+    def estimate_latency(self, stage: str) -> float:
+        """Returns the expected duration of a call in a stage, from this run's calls or a default estimate."""
+        with self._lock:
+            return self._stage_latency.get(stage, STAGE_LATENCY_ESTIMATES.get(stage, 60.0))
+    
+    def _record(self, model_name: str, stage: str, latency: float, failed: bool) -> None:
+        timeout = self.timeouts.get(stage)
+        slow = bool(timeout) and latency > timeout * MODEL_SLOW_FRACTION
+        with self._lock:
+            stats = self._stats.get((model_name, stage))
+            if stats is None:
+                stats = self._stats[(model_name, stage)] = ModelStats()
+            stats.record(latency, failed, slow)
+            if not failed:
+                previous = self._stage_latency.get(stage)
+                self._stage_latency[stage] = latency if previous is None else previous + MODEL_STATS_ALPHA * (latency - previous)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-model call counts, error counts and latency, with a per-stage breakdown under 'stages'."""
+        summary = {}
+        with self._lock:
+            for (model_name, stage), stats in self._stats.items():
+                entry = summary.setdefault(model_name, {"calls": 0, "errors": 0, "total_latency": 0.0, "stages": {}})
+                entry["calls"] += stats.calls
+                entry["errors"] += stats.errors
+                entry["total_latency"] += stats.total_latency
+                entry["stages"][stage] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "recent_latency": stats.avg_latency,
+                    "recent_error_rate": stats.error_rate,
+                }
+        for entry in summary.values():
+            entry["avg_latency"] = entry.pop("total_latency") / entry["calls"] if entry["calls"] else 0.0
+        return summary
+
+def parse_model_routes(route_specs: Optional[List[str]]) -> Dict[str, List[str]]:
+    """
+    Parses '--route STAGE=MODEL[,FALLBACK...]' specifications on top of the default routes.
+    
+    Args:
+        route_specs: List of 'stage=model1,model2' strings
+        
+    Returns:
+        Complete mapping of stage -> model chain
+    """
+    routes = {stage: list(models) for stage, models in DEFAULT_MODEL_ROUTES.items()}
+    for spec in route_specs or []:
+        stage, sep, models = spec.partition("=")
+        stage = stage.strip()
+        model_chain = [model.strip() for model in models.split(",") if model.strip()]
+        if not sep or not stage or not model_chain:
+            raise ValueError(f"Invalid route '{spec}'. Expected STAGE=MODEL[,FALLBACK...]")
+        if stage not in DEFAULT_MODEL_ROUTES:
+            raise ValueError(f"Unknown stage '{stage}' in route '{spec}'. Valid stages: {', '.join(DEFAULT_MODEL_ROUTES)}")
+        routes[stage] = model_chain
+    return routes
+
+model_router = ModelRouter(DEFAULT_MODEL_ROUTES)
+
+def configure_model_router(routes: Optional[Dict[str, List[str]]] = None, backend=None,
+                           cache: Optional[ResponseCache] = None) -> ModelRouter:
+    """
+    Replaces the module-level model router.
+    
+    Args:
+        routes: Mapping of stage -> model chain (defaults to DEFAULT_MODEL_ROUTES)
+        backend: Model backend (defaults to GeminiBackend; use FakeModelBackend for offline testing)
+        cache: Optional response cache shared by all stages
+        
+    Returns:
+        The new router
+    """
+    global model_router
+    model_router = ModelRouter(routes or DEFAULT_MODEL_ROUTES, backend, cache=cache)
+    return model_router
+
+# --- Run Deadline ---
+DEADLINE_RESERVE_FRACTION = 0.05   # Share of the deadline kept back for assembling and saving the report
+DEADLINE_MIN_RESERVE = 2.0
+
+# Share of the time still available that each stage of main() may use, in pipeline order
+DEADLINE_STAGE_FRACTIONS = {
+    "queries": 0.1,
+    "research": 0.5,
+    "summaries": 0.25,
+    "synthesis": 1.0,
+}
+
+class RunDeadline:
+    """
+    Overall time budget for a run, split into per-stage budgets.
+    
+    Stages record what they had to cut so the report can say so.
+    
+    Args:
+        seconds: Total seconds available for the run
+    """
+    
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = time.time()
+        self.end = self.start + seconds
+        self.reserve = max(DEADLINE_MIN_RESERVE, seconds * DEADLINE_RESERVE_FRACTION)
+        self.stage_name = None
+        self.stage_end = self.end - self.reserve
+        self.cuts = []
+    
+    def begin_stage(self, name: str, fraction: float) -> None:
+        """Starts a stage that may use the given fraction of the remaining (unreserved) time."""
+        now = time.time()
+        self.stage_name = name
+        self.stage_end = now + max(0.0, self.end - self.reserve - now) * fraction
+        print(f"[Deadline] {name}: {self.stage_end - now:.0f}s budget ({self.end - now:.0f}s left overall)")
+    
+    def stage_remaining(self) -> float:
+        """Seconds left in the current stage."""
+        return self.stage_end - time.time()
+    
+    def stage_expired(self) -> bool:
+        return self.stage_remaining() <= 0
+    
+    def elapsed(self) -> float:
+        return time.time() - self.start
+    
+    def note(self, message: str) -> None:
+        """Records something that was cut to meet the deadline."""
+        self.cuts.append(f"{self.stage_name or 'run'}: {message}")
+        print(f"[Deadline] {message}")
+    
+    def metadata_section(self) -> str:
+        """Markdown section describing the time budget and what was cut."""
+        lines = ["## Report Metadata", "",
+                 f"- Deadline: {self.seconds:.0f}s",
+                 f"- Completed in: {self.elapsed():.1f}s"]
+        if self.cuts:
+            lines.append("- Cut to meet the deadline:")
+            lines.extend(f"  - {cut}" for cut in self.cuts)
+        else:
+            lines.append("- Nothing was cut to meet the deadline.")
+        return "\n".join(lines) + "\n"
+
 # --- Google Search Tool ---
-def google_search(query: str, num_results: int = 5, site_search: Optional[str] = None) -> List[Dict[str, str]]:
+# The Custom Search API returns at most 10 results per request and refuses
+# any `start` offset beyond 91, so deeper result lists are fetched page by page.
+SEARCH_PAGE_SIZE = 10
+SEARCH_MAX_RESULTS = 100
+SEARCH_MAX_CONCURRENT_PAGES = 5
+SEARCH_MAX_CONCURRENT_SITES = 5
+SEARCH_MAX_REQUESTS_PER_SECOND = 5   # Stay under the Custom Search per-user rate limit
+SEARCH_RRF_K = 60                    # Reciprocal rank fusion constant for merging per-site result lists
+SEARCH_REQUEST_TIMEOUT = 30          # Seconds before a Custom Search request is abandoned
+
+_search_service_local = threading.local()
+_search_rate_lock = threading.Lock()
+_search_next_request = 0.0
+
+def _wait_for_search_slot() -> None:
+    """Spaces Custom Search requests from all threads to at most SEARCH_MAX_REQUESTS_PER_SECOND."""
+    global _search_next_request
+    with _search_rate_lock:
+        now = time.time()
+        slot = max(now, _search_next_request)
+        _search_next_request = slot + 1.0 / SEARCH_MAX_REQUESTS_PER_SECOND
+    if slot > now:
+        time.sleep(slot - now)
+
+def _get_search_service():
+    """Returns a per-thread Custom Search service (httplib2 transports are not thread-safe)."""
+    service = getattr(_search_service_local, "service", None)
+    if service is None:
+        service = build("customsearch", "v1", developerKey=search_api_key,
+                        http=httplib2.Http(timeout=SEARCH_REQUEST_TIMEOUT))
+        _search_service_local.service = service
+    return service
+
+def _fetch_search_page(search_params: Dict[str, Any], start: int, num: int,
+                       deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Fetches a single page of Custom Search results.
+    
+    Args:
+        search_params: Base search parameters shared by every page
+        start: 1-based index of the first result on this page
+        num: Number of results to request for this page (max 10)
+        deadline: Optional absolute time (time.time()) by which the request must finish
+        
+    Returns:
+        Raw API response for the page
+        
+    Raises:
+        TimeoutError if the deadline has passed before the request could be sent
+    """
+    page_params = dict(search_params, start=start, num=num)
+    _wait_for_search_slot()
+    request = _get_search_service().cse().list(**page_params)
+    if deadline is None:
+        return request.execute()
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise TimeoutError("No time left before the deadline for a search request")
+    # A one-off transport whose socket timeout is capped by the time left
+    return request.execute(http=httplib2.Http(timeout=min(SEARCH_REQUEST_TIMEOUT, remaining)))
+
+def google_search(query: str, num_results: int = 5, site_search: Optional[str] = None,
+                  deadline: Optional[float] = None) -> List[Dict[str, str]]:
     """
     Performs a Google search with the given query and returns a list of search results.
     
+    Requests for more than 10 results are split into pages. The first page is
+    fetched alone; the later pages that its reported result count says can hold
+    results are then fetched concurrently and merged back in rank order.
+    
     Args:
         query: The search query string
-        num_results: Number of search results to return (max 10)
+        num_results: Number of search results to return (max 100)
         site_search: Optional site to restrict search to (e.g., "example.com")
+        deadline: Optional absolute time by which every search request must finish
         
     Returns:
         List of dictionaries containing search results with 'title', 'link', and 'snippet'
@@ -58,16 +621,13 @@ def google_search(query: str, num_results: int = 5, site_search: Optional[str] =
             if "site:" not in query:
                 final_query = f"{query} site:{site_search}"
         
+        num_results = max(1, min(num_results, SEARCH_MAX_RESULTS))
         print(f"\n[GoogleSearch] Executing search: '{final_query}' (max {num_results} results)")
         
-        # Build Google Custom Search service
-        service = build("customsearch", "v1", developerKey=search_api_key)
-        
         # Set up search parameters with date sorting when appropriate
         search_params = {
             'q': final_query,
             'cx': google_cse_id,
-            'num': min(num_results, 10)  # API limitation
         }
         
         # If query contains date-related terms, request date sorting
@@ -84,13 +644,50 @@ def google_search(query: str, num_results: int = 5, site_search: Optional[str] =
                 
             print(f"[GoogleSearch] Restricting results to {search_params['dateRestrict']} for recency-focused query")
         
-        # Execute search
-        result = service.cse().list(**search_params).execute()
+        # Split the request into pages of at most 10 results each
+        pages = []
+        for start in range(1, num_results + 1, SEARCH_PAGE_SIZE):
+            pages.append((start, min(SEARCH_PAGE_SIZE, num_results - start + 1)))
+        
+        # The first page reports how many results exist, so only pages that can hold
+        # results are requested (concurrently) after it; every request is billed
+        first_page = _fetch_search_page(search_params, pages[0][0], pages[0][1], deadline)
+        later_pages = []
+        if len(first_page.get("items", [])) == pages[0][1] and "nextPage" in first_page.get("queries", {}):
+            try:
+                total_results = int(first_page.get("searchInformation", {}).get("totalResults", num_results))
+            except (TypeError, ValueError):
+                total_results = num_results
+            later_pages = [(start, min(num, total_results - start + 1)) for start, num in pages[1:] if start <= total_results]
         
-        # Extract and return search results
+        page_results = [(pages[0][0], pages[0][1], first_page, None)]
+        if later_pages:
+            print(f"[GoogleSearch] Fetching {len(later_pages)} more result pages concurrently")
+            with ThreadPoolExecutor(max_workers=min(len(later_pages), SEARCH_MAX_CONCURRENT_PAGES)) as executor:
+                page_futures = [executor.submit(_fetch_search_page, search_params, start, num, deadline)
+                                for start, num in later_pages]
+            for (start, num), future in zip(later_pages, page_futures):
+                try:
+                    page_results.append((start, num, future.result(), None))
+                except Exception as e:
+                    page_results.append((start, num, None, e))
+        
+        # Merge pages in rank order, dropping duplicate links and stopping at a failed
+        # page or once the API reports that there are no further results
         search_results = []
-        if "items" in result:
-            for item in result["items"]:
+        seen_links = set()
+        for page_idx, (start, num, result, error) in enumerate(page_results):
+            if error is not None:
+                print(f"[GoogleSearch] Warning: Failed to fetch result page starting at {start}: {error}")
+                break
+            
+            items = result.get("items", [])
+            for item in items:
+                link = item.get("link", "")
+                if link and link in seen_links:
+                    continue
+                seen_links.add(link)
+                
                 # Extract date when available
                 metatags = item.get("pagemap", {}).get("metatags", [{}])
                 date = None
@@ -105,11 +702,18 @@ def google_search(query: str, num_results: int = 5, site_search: Optional[str] =
                 
                 search_results.append({
                     "title": item.get("title", "No title"),
-                    "link": item.get("link", ""),
+                    "link": link,
                     "snippet": item.get("snippet", "No description available"),
                     "date": date if date else "Date not available"
                 })
             
+            if len(items) < num or "nextPage" not in result.get("queries", {}):
+                if start + num - 1 < num_results:
+                    print(f"[GoogleSearch] No more results available after {start + len(items) - 1} results")
+                break
+        
+        if search_results:
+            search_results = search_results[:num_results]
             print(f"[GoogleSearch] Found {len(search_results)} results")
             return search_results
         else:
@@ -132,13 +736,600 @@ def google_search(query: str, num_results: int = 5, site_search: Optional[str] =
         print(f"[GoogleSearch] Error: {str(e)}")
         return []
 
+def parse_site_list(value: Optional[str]) -> List[str]:
+    """
+    Parses a --site value into a list of domains.
+    
+    Args:
+        value: A domain, a comma-separated list of domains, or the path of a file
+            with one domain per line ('#' starts a comment)
+            
+    Returns:
+        Domains in the order given, without duplicates (empty if value is empty)
+    """
+    if not value:
+        return []
+    if os.path.isfile(value):
+        with open(value, "r", encoding="utf-8") as f:
+            entries = [line.split("#", 1)[0] for line in f]
+    else:
+        entries = value.split(",")
+    sites = []
+    for entry in entries:
+        site = entry.strip()
+        if site.lower().startswith("site:"):
+            site = site[len("site:"):]
+        site = re.sub(r'^https?://', '', site).rstrip("/")
+        if site and site not in sites:
+            sites.append(site)
+    return sites
+
+def search_sites(query: str, num_results: int, sites: Optional[Union[str, List[str]]] = None,
+                 deadline: Optional[float] = None) -> List[Dict[str, str]]:
+    """
+    Runs a search restricted to each of several sites concurrently and merges the results.
+    
+    num_results is split across the sites, and the per-site result lists are merged
+    with reciprocal rank fusion, so each site's best results come first and links
+    found through more than one site are kept once. Every site keeps at least its
+    top result; which sites win ties for the remaining slots rotates with the query.
+    
+    Args:
+        query: The search query string
+        num_results: Number of results to return (max 100); raised to the number of sites if lower
+        sites: A single site, a list of sites, or None for an unrestricted search
+        deadline: Optional absolute time by which every search request must finish
+        
+    Returns:
+        Merged search results in fused rank order
+    """
+    if sites is None or isinstance(sites, str):
+        return google_search(query, num_results=num_results, site_search=sites, deadline=deadline)
+    if len(sites) <= 1:
+        return google_search(query, num_results=num_results, site_search=sites[0] if sites else None,
+                             deadline=deadline)
+    
+    per_site = math.ceil(num_results / len(sites))
+    print(f"\n[GoogleSearch] Searching {len(sites)} sites concurrently ({per_site} results each) for: '{query}'")
+    with ThreadPoolExecutor(max_workers=min(len(sites), SEARCH_MAX_CONCURRENT_SITES)) as executor:
+        site_results = list(executor.map(lambda site: google_search(query, num_results=per_site, site_search=site,
+                                                                  deadline=deadline), sites))
+    
+    # Ties (e.g. every site's first result) are broken in a site order that starts at a different site per query
+    offset = int(hashlib.sha1(query.encode("utf-8")).hexdigest(), 16) % len(sites)
+    scores = {}
+    merged = {}
+    tie_order = {}
+    for site_index, results in enumerate(site_results):
+        for rank, result in enumerate(results, start=1):
+            link = result.get("link")
+            if not link:
+                continue
+            scores[link] = scores.get(link, 0.0) + 1.0 / (SEARCH_RRF_K + rank)
+            merged.setdefault(link, result)
+            tie_order.setdefault(link, (site_index - offset) % len(sites))
+    fused = sorted(merged.values(), key=lambda result: (-scores[result["link"]], tie_order[result["link"]]))
+    keep = max(num_results, len(sites))
+    print(f"[GoogleSearch] Merged {sum(len(results) for results in site_results)} results from "
+          f"{sum(1 for results in site_results if results)}/{len(sites)} sites into {len(fused)} unique results, "
+          f"keeping the top {min(keep, len(fused))}")
+    return fused[:keep]
+
+# --- Pooled HTTP Session ---
+# All page fetches share one connection pool so that repeated requests to the
+# same host reuse TCP/TLS connections instead of handshaking every time.
+HTTP_POOL_HOSTS = 100
+HTTP_PER_HOST_CONNECTIONS = 4
+HTTP_CONNECT_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.3    # urllib3 backoff factor between connect retries
+HTTP_READ_CHUNK = 64 * 1024  # Bodies are read in chunks of this size when a fetch has a deadline
+HTTP_MIN_TIMEOUT = 0.5
+
+try:
+    import httpx  # Optional, only needed for HTTP/2 support
+except ImportError:
+    httpx = None
+
+_http_config = {
+    "pool_hosts": HTTP_POOL_HOSTS,
+    "per_host_connections": HTTP_PER_HOST_CONNECTIONS,
+    "connect_retries": HTTP_CONNECT_RETRIES,
+    "http2": False,
+}
+_http_lock = threading.Lock()
+_http_adapter = None
+_http2_client = None
+_http_session_local = threading.local()
+_http_host_slots = {}
+_http_stats = {"requests": 0, "http2_connections": 0}
+
+def configure_http_session(per_host_connections: int = HTTP_PER_HOST_CONNECTIONS,
+                           connect_retries: int = HTTP_CONNECT_RETRIES,
+                           http2: bool = False,
+                           pool_hosts: int = HTTP_POOL_HOSTS) -> None:
+    """
+    Configures the shared HTTP session used by the scraper. Must be called before the first fetch.
+    
+    Args:
+        per_host_connections: Maximum number of simultaneous connections to a single host
+        connect_retries: Number of times to retry a request that failed to connect
+        http2: Whether to use HTTP/2 (requires the optional 'httpx[http2]' package)
+        pool_hosts: Number of hosts whose connection pools are kept alive
+    """
+    global _http_adapter, _http2_client
+    
+    if http2 and httpx is None:
+        print("[HttpSession] Warning: HTTP/2 requested but 'httpx' is not installed. Falling back to HTTP/1.1.")
+        http2 = False
+    
+    with _http_lock:
+        _http_config.update({
+            "pool_hosts": max(1, pool_hosts),
+            "per_host_connections": max(1, per_host_connections),
+            "connect_retries": max(0, connect_retries),
+            "http2": http2,
+        })
+        _http_adapter = None
+        _http2_client = None
+        _http_host_slots.clear()
+
+def _get_http_adapter() -> requests.adapters.HTTPAdapter:
+    """Returns the connection-pooling adapter shared by all per-thread sessions."""
+    global _http_adapter
+    with _http_lock:
+        if _http_adapter is None:
+            retries = Retry(
+                total=None,
+                connect=_http_config["connect_retries"],
+                read=False,  # Read timeouts surface as ReadTimeout instead of a MaxRetryError
+                status=0,
+                redirect=10,
+                backoff_factor=HTTP_RETRY_BACKOFF,
+                raise_on_redirect=True,
+                raise_on_status=False,
+            )
+            _http_adapter = requests.adapters.HTTPAdapter(
+                pool_connections=_http_config["pool_hosts"],
+                pool_maxsize=_http_config["per_host_connections"],
+                max_retries=retries,
+                pool_block=True,
+            )
+        return _http_adapter
+
+def _get_http_session() -> requests.Session:
+    """Returns this thread's requests session, backed by the shared connection pool."""
+    adapter = _get_http_adapter()
+    session = getattr(_http_session_local, "session", None)
+    if session is None or getattr(_http_session_local, "adapter", None) is not adapter:
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_session_local.session = session
+        _http_session_local.adapter = adapter
+    return session
+
+def _get_http2_client():
+    """Returns the shared (thread-safe) httpx client used when HTTP/2 is enabled."""
+    global _http2_client
+    with _http_lock:
+        if _http2_client is None:
+            transport = httpx.HTTPTransport(
+                http2=True,
+                retries=_http_config["connect_retries"],
+                limits=httpx.Limits(
+                    max_connections=_http_config["pool_hosts"] * _http_config["per_host_connections"],
+                    max_keepalive_connections=_http_config["pool_hosts"],
+                ),
+            )
+            _http2_client = httpx.Client(transport=transport, follow_redirects=True, max_redirects=10)
+        return _http2_client
+
+def _get_host_slot(url: str) -> threading.BoundedSemaphore:
+    """Returns the semaphore limiting concurrent requests to the URL's host."""
+    host = urlparse(url).netloc.lower()
+    with _http_lock:
+        slot = _http_host_slots.get(host)
+        if slot is None:
+            slot = threading.BoundedSemaphore(_http_config["per_host_connections"])
+            _http_host_slots[host] = slot
+        return slot
+
+class _Http2Response:
+    """Minimal requests-compatible view of an httpx response."""
+    
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+    
+    @property
+    def text(self) -> str:
+        return self._response.text
+    
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+    
+    def raise_for_status(self) -> None:
+        try:
+            self._response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise requests.exceptions.HTTPError(str(e), response=self) from e
+
+def _count_http2_connection(event_name: str, info: Dict[str, Any]) -> None:
+    """httpcore trace hook counting newly established connections."""
+    if event_name == "connection.connect_tcp.complete":
+        with _http_lock:
+            _http_stats["http2_connections"] += 1
+
+def _connect_timeout(remaining: float) -> float:
+    """Per-attempt connect timeout that fits every connect retry, and the backoff between them, in the remaining time."""
+    retries = _http_config["connect_retries"]
+    # urllib3 sleeps backoff * 2^(n-1) before the n-th consecutive retry, skipping the first
+    backoff = sum(HTTP_RETRY_BACKOFF * 2 ** (n - 1) for n in range(2, retries + 1))
+    return max(HTTP_MIN_TIMEOUT, (remaining - backoff) / (retries + 1))
+
+def _body_chunks(response: requests.Response) -> Iterator[bytes]:
+    """Yields a streamed requests body as its bytes arrive, so a slowly sent body cannot stall one read."""
+    raw = response.raw
+    if not hasattr(raw, "read1") or raw.chunked:
+        # Older urllib3 (or a chunked body, which urllib3 already yields chunk by chunk)
+        yield from response.iter_content(HTTP_READ_CHUNK)
+        return
+    while True:
+        chunk = raw.read1(HTTP_READ_CHUNK, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+def _read_body(url: str, chunks: Iterable[bytes], deadline: float) -> bytes:
+    """Reads a streamed body, giving up once the deadline has passed."""
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        if time.time() > deadline:
+            raise requests.exceptions.Timeout(f"Reading {url} did not finish before the deadline")
+    return b"".join(body)
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 25,
+             deadline: Optional[float] = None):
+    """
+    Performs a GET request through the shared connection pool.
+    
+    Args:
+        url: URL to fetch
+        headers: Optional request headers
+        timeout: Request timeout in seconds
+        deadline: Optional absolute time (time.time()) by which the whole request must finish,
+            including waiting for a connection slot, connect retries and reading the body
+        
+    Returns:
+        A requests.Response (or a compatible wrapper when HTTP/2 is enabled)
+        
+    Raises:
+        requests.exceptions.RequestException subclasses on network errors, for both backends,
+        and requests.exceptions.Timeout when the deadline passes
+    """
+    slot = _get_host_slot(url)
+    if not slot.acquire(timeout=max(0.0, deadline - time.time()) if deadline is not None else None):
+        raise requests.exceptions.Timeout(f"No connection slot for {url} before the deadline")
+    try:
+        with _http_lock:
+            _http_stats["requests"] += 1
+        
+        if deadline is not None:
+            remaining = max(HTTP_MIN_TIMEOUT, deadline - time.time())
+            connect_timeout = min(timeout, _connect_timeout(remaining))
+            read_timeout = min(timeout, remaining)
+        
+        if not _http_config["http2"]:
+            if deadline is None:
+                return _get_http_session().get(url, headers=headers, timeout=timeout, allow_redirects=True)
+            response = _get_http_session().get(url, headers=headers, timeout=(connect_timeout, read_timeout),
+                                               allow_redirects=True, stream=True)
+            with closing(response):
+                response._content = _read_body(url, _body_chunks(response), deadline)
+            return response
+        
+        try:
+            if deadline is None:
+                response = _get_http2_client().get(url, headers=headers, timeout=timeout,
+                                                   extensions={"trace": _count_http2_connection})
+                return _Http2Response(response)
+            client = _get_http2_client()
+            request = client.build_request("GET", url, headers=headers,
+                                           timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                                           extensions={"trace": _count_http2_connection})
+            response = client.send(request, stream=True)
+            try:
+                response._content = _read_body(url, response.iter_bytes(), deadline)
+            finally:
+                response.close()
+            return _Http2Response(response)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TooManyRedirects as e:
+            raise requests.exceptions.TooManyRedirects(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+    finally:
+        slot.release()
+
+def get_http_session_stats() -> Dict[str, Any]:
+    """
+    Returns connection reuse statistics for the shared HTTP session.
+    
+    Returns:
+        Dictionary with 'requests', 'connections', 'reused' and 'reuse_rate' keys
+    """
+    with _http_lock:
+        total_requests = _http_stats["requests"]
+        if _http_config["http2"]:
+            connections = _http_stats["http2_connections"]
+        else:
+            connections = 0
+            if _http_adapter is not None:
+                pools = _http_adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+    
+    reused = max(0, total_requests - connections)
+    return {
+        "requests": total_requests,
+        "connections": connections,
+        "reused": reused,
+        "reuse_rate": (reused / total_requests) if total_requests else 0.0,
+        "http2": _http_config["http2"],
+    }
+
+# Shared newspaper3k configuration (articles are parsed from HTML we already fetched)
+_newspaper_config = NewspaperConfig()
+_newspaper_config.fetch_images = False
+_newspaper_config.memoize_articles = False
+
+# --- Domain Health Tracking ---
+# Fetch latency and failures are tracked per domain across runs. The history
+# drives per-domain timeouts, a circuit breaker that skips domains which keep
+# failing or keep blocking the scraper, and hedged (duplicate) requests to cut
+# tail latency on slow hosts.
+SCRAPE_DEFAULT_TIMEOUT = 25
+SCRAPE_MIN_TIMEOUT = 5
+DOMAIN_LATENCY_SAMPLES = 50          # Latency samples kept per domain
+DOMAIN_MIN_SAMPLES = 5               # Samples needed before timeouts/hedging adapt
+DOMAIN_TIMEOUT_MULTIPLIER = 2.0      # Timeout = p95 latency * multiplier + slack
+DOMAIN_TIMEOUT_SLACK = 2.0
+DOMAIN_BREAKER_FAILURES = 3          # Consecutive failures that open the breaker
+DOMAIN_BREAKER_BLOCKED = 4           # Consecutive blocked fetches (403s, unextractable pages) that open the breaker
+DOMAIN_BREAKER_COOLDOWN = 6 * 3600   # Seconds the breaker stays open before a trial request
+DOMAIN_HEDGE_PERCENTILE = 0.9        # Send a duplicate request once this latency percentile has passed
+DOMAIN_HEDGE_MIN_DELAY = 1.0
+DOMAIN_HEALTH_PATH = os.path.join(CACHE_DIR, "domain_health.json")
+DOMAIN_FAILURE_STATUSES = (429,)      # Client errors that still mean the host is struggling (5xx always do)
+DOMAIN_BLOCKED_STATUSES = (401, 403)  # Client errors that usually mean the scraper is being turned away
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """Returns the given percentile (0-1) of a list of samples using nearest-rank."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+class DomainHealthTracker:
+    """
+    Per-domain fetch statistics persisted between runs.
+    
+    Args:
+        path: JSON file the statistics are loaded from and saved to (None keeps them in memory only)
+    """
+    
+    def __init__(self, path: Optional[str] = DOMAIN_HEALTH_PATH):
+        self.path = path
+        self._domains = {}
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._domains = json.load(f)
+        except (OSError, ValueError):
+            self._domains = {}
+    
+    def save(self) -> None:
+        """Persists the statistics so later runs start with this run's history."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._domains)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[DomainHealth] Warning: Could not save domain health: {e}")
+    
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Returns the host of a URL without a leading 'www.'."""
+        host = urlparse(url).netloc.lower().split("@")[-1].split(":")[0]
+        return host[4:] if host.startswith("www.") else host
+    
+    def _entry(self, domain: str) -> Dict[str, Any]:
+        entry = self._domains.get(domain)
+        if entry is None:
+            entry = self._domains[domain] = {
+                "latencies": [],
+                "successes": 0,
+                "failures": 0,
+                "consecutive_failures": 0,
+                "consecutive_blocked": 0,
+                "breaker_open_until": 0.0,
+            }
+        return entry
+    
+    def allow(self, domain: str) -> bool:
+        """Returns False while the domain's circuit breaker is open."""
+        with self._lock:
+            entry = self._domains.get(domain)
+            if entry is None:
+                return True
+            return time.time() >= entry["breaker_open_until"]
+    
+    def timeout_for(self, domain: str) -> float:
+        """Returns the fetch timeout for a domain, derived from its latency history."""
+        with self._lock:
+            latencies = list(self._domains.get(domain, {}).get("latencies", []))
+        if len(latencies) < DOMAIN_MIN_SAMPLES:
+            return SCRAPE_DEFAULT_TIMEOUT
+        timeout = _percentile(latencies, 0.95) * DOMAIN_TIMEOUT_MULTIPLIER + DOMAIN_TIMEOUT_SLACK
+        return round(min(SCRAPE_DEFAULT_TIMEOUT, max(SCRAPE_MIN_TIMEOUT, timeout)), 1)
+    
+    def hedge_delay(self, domain: str) -> Optional[float]:
+        """Returns how long to wait before sending a duplicate request, or None if there is too little history."""
+        with self._lock:
+            latencies = list(self._domains.get(domain, {}).get("latencies", []))
+        if len(latencies) < DOMAIN_MIN_SAMPLES:
+            return None
+        return max(DOMAIN_HEDGE_MIN_DELAY, _percentile(latencies, DOMAIN_HEDGE_PERCENTILE))
+    
+    def record(self, domain: str, latency: Optional[float], success: bool, blocked: bool = False) -> None:
+        """
+        Records the outcome of a fetch.
+        
+        Args:
+            domain: Domain that was fetched
+            latency: Seconds the fetch took (None if it never completed)
+            success: Whether the host answered normally. Only timeouts, connection errors,
+                5xx and 429 responses count as failures; a 404 does not.
+            blocked: Whether the host answered but turned the scraper away (a 401/403, or a
+                page with no extractable text). Blocked fetches are counted separately from
+                failures and open the breaker after DOMAIN_BREAKER_BLOCKED in a row.
+        """
+        with self._lock:
+            entry = self._entry(domain)
+            entry.setdefault("consecutive_blocked", 0)  # Missing in histories saved by older versions
+            if latency is not None:
+                entry["latencies"].append(round(latency, 3))
+                del entry["latencies"][:-DOMAIN_LATENCY_SAMPLES]
+            if success and blocked:
+                entry["successes"] += 1
+                entry["consecutive_failures"] = 0
+                entry["consecutive_blocked"] += 1
+                if entry["consecutive_blocked"] >= DOMAIN_BREAKER_BLOCKED:
+                    entry["breaker_open_until"] = time.time() + DOMAIN_BREAKER_COOLDOWN
+                    print(f"[DomainHealth] Opening circuit breaker for {domain} after "
+                          f"{entry['consecutive_blocked']} consecutive blocked or unextractable pages")
+                return
+            if success:
+                entry["successes"] += 1
+                entry["consecutive_failures"] = 0
+                entry["consecutive_blocked"] = 0
+                entry["breaker_open_until"] = 0.0
+                return
+            entry["failures"] += 1
+            entry["consecutive_failures"] += 1
+            if entry["consecutive_failures"] >= DOMAIN_BREAKER_FAILURES:
+                entry["breaker_open_until"] = time.time() + DOMAIN_BREAKER_COOLDOWN
+                print(f"[DomainHealth] Opening circuit breaker for {domain} after "
+                      f"{entry['consecutive_failures']} consecutive failures")
+    
+    def get_stats(self, domain: str) -> Dict[str, Any]:
+        """Returns latency percentiles and failure rate for a domain."""
+        with self._lock:
+            entry = self._domains.get(domain)
+            entry = dict(entry, latencies=list(entry["latencies"])) if entry is not None else None
+        if entry is None:
+            return {"samples": 0, "p50": None, "p95": None, "failure_rate": 0.0, "consecutive_blocked": 0,
+                    "breaker_open": False}
+        latencies = entry["latencies"]
+        attempts = entry["successes"] + entry["failures"]
+        return {
+            "samples": len(latencies),
+            "p50": _percentile(latencies, 0.5) if latencies else None,
+            "p95": _percentile(latencies, 0.95) if latencies else None,
+            "failure_rate": entry["failures"] / attempts if attempts else 0.0,
+            "consecutive_blocked": entry.get("consecutive_blocked", 0),
+            "breaker_open": time.time() < entry["breaker_open_until"],
+        }
+
+domain_health = None
+scrape_hedging_enabled = True
+
+def configure_domain_health(enabled: bool = True, hedge: bool = True, path: Optional[str] = DOMAIN_HEALTH_PATH) -> None:
+    """
+    Enables or disables per-domain health tracking for the scraper.
+    
+    Args:
+        enabled: Track domain health, adapt timeouts and apply circuit breakers
+        hedge: Send a duplicate request when a fetch runs past the domain's usual latency
+        path: File the domain history is persisted to
+    """
+    global domain_health, scrape_hedging_enabled
+    domain_health = DomainHealthTracker(path) if enabled else None
+    scrape_hedging_enabled = hedge
+
+def _hedged_get(url: str, headers: Dict[str, str], timeout: float, hedge_after: Optional[float],
+                deadline: Optional[float] = None):
+    """
+    Fetches a URL, sending a second identical request if the first has not finished after hedge_after seconds.
+    
+    Args:
+        deadline: Optional absolute time by which a response must have arrived; both attempts are
+            bound by it and the hedged request is not sent if it would start too late
+    
+    Returns:
+        The first successful response
+        
+    Raises:
+        The first request's exception if every attempt fails, or
+        requests.exceptions.Timeout if no attempt finished before the deadline
+    """
+    if deadline is not None and hedge_after and time.time() + hedge_after + HTTP_MIN_TIMEOUT >= deadline:
+        hedge_after = None
+    if not hedge_after or hedge_after >= timeout:
+        return http_get(url, headers=headers, timeout=timeout, deadline=deadline)
+    
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        attempts = [executor.submit(http_get, url, headers, timeout, deadline)]
+        done, _ = wait(attempts, timeout=hedge_after)
+        if not done:
+            print(f"[WebScraper] No response after {hedge_after:.1f}s, sending hedged request for {url}")
+            attempts.append(executor.submit(http_get, url, headers, max(1.0, timeout - hedge_after), deadline))
+        
+        first_error = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.time()) if deadline is not None else None,
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise requests.exceptions.Timeout(f"No response from {url} before the deadline")
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    if first_error is None or future is attempts[0]:
+                        first_error = e
+        raise first_error
+    finally:
+        # The slower attempt finishes (bounded by its timeout and the deadline) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
 # --- Web Content Scraper Tool ---
-def scrape_web_content(url: str) -> Dict[str, str]:
+def scrape_web_content(url: str, max_timeout: Optional[float] = None) -> Dict[str, str]:
     """
     Fetches content from a URL, extracts the main text, and returns cleaned content.
     
     Args:
         url: URL to scrape
+        max_timeout: Optional cap on the whole fetch, including connect retries, a hedged request
+            and reading the body, e.g. the time left before a deadline
         
     Returns:
         Dictionary with 'content' or 'error' key
@@ -150,6 +1341,43 @@ def scrape_web_content(url: str) -> Dict[str, str]:
         print(f"[WebScraper] Error: {error_msg}")
         return {"error": error_msg}
     
+    domain = DomainHealthTracker.domain_of(url)
+    tracker = domain_health
+    if tracker is not None and not tracker.allow(domain):
+        error_msg = f"Skipped: circuit breaker open for {domain} after repeated failures."
+        print(f"[WebScraper] Info: {error_msg} URL: {url}")
+        return {"error": error_msg}
+    
+    timeout = tracker.timeout_for(domain) if tracker is not None else SCRAPE_DEFAULT_TIMEOUT
+    fetch_deadline = None
+    if max_timeout is not None:
+        timeout = max(1.0, min(timeout, max_timeout))
+        # The cap covers the whole fetch: connect retries, the hedged request and reading the body
+        fetch_deadline = time.time() + timeout
+    hedge_after = tracker.hedge_delay(domain) if tracker is not None and scrape_hedging_enabled else None
+    
+    result = _fetch_and_extract(url, timeout, hedge_after, fetch_deadline)
+    
+    if tracker is not None and result.get("outcome") != "skipped":
+        tracker.record(domain, result.get("latency"), success=result.get("outcome") != "failure",
+                       blocked=result.get("outcome") == "blocked")
+    result.pop("outcome", None)
+    result.pop("latency", None)
+    return result
+
+def _fetch_and_extract(url: str, timeout: float, hedge_after: Optional[float],
+                       deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Fetches and extracts a page for scrape_web_content.
+    
+    Returns:
+        Dictionary with 'content' or 'error', plus 'latency' (fetch seconds, None if the fetch did
+        not complete) and 'outcome': 'failure' for timeouts, connection errors, 5xx and 429
+        responses, 'blocked' for 401/403 responses and pages with no extractable text,
+        'skipped' for results that say nothing about domain health, and absent when the host
+        answered normally
+    """
+    latency = None
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
@@ -161,17 +1389,19 @@ def scrape_web_content(url: str) -> Dict[str, str]:
     }
     
     try:
-        print(f"[WebScraper] Fetching URL: {url}")
-        response = requests.get(url, headers=headers, timeout=25, allow_redirects=True)
+        print(f"[WebScraper] Fetching URL: {url} (timeout {timeout}s)")
+        fetch_start = time.time()
+        response = _hedged_get(url, headers, timeout, hedge_after, deadline)
+        latency = time.time() - fetch_start
         response.raise_for_status()
         
         content_type = response.headers.get('Content-Type', '').lower()
         if 'html' not in content_type:
             error_msg = f"Skipping URL: Content-Type is '{content_type}', not HTML."
             print(f"[WebScraper] Info: {error_msg} URL: {url}")
-            return {"error": error_msg}
+            return {"error": error_msg, "latency": latency, "outcome": "skipped"}
         
-        article = Article(url)
+        article = Article(url, config=_newspaper_config)
         article.download(input_html=response.text)
         article.parse()
         content_text = article.text
@@ -192,7 +1422,7 @@ def scrape_web_content(url: str) -> Dict[str, str]:
             if not content_text or len(content_text) < 100:
                 error_msg = f"Content Extraction Failed: newspaper3k and fallback method could not extract meaningful text content from {url}"
                 print(f"[WebScraper] Error: {error_msg}")
-                return {"error": error_msg}
+                return {"error": error_msg, "latency": latency, "outcome": "blocked"}
         
         lines = [line.strip() for line in content_text.splitlines()]
         cleaned_text = '\n'.join(line for line in lines if line)
@@ -200,7 +1430,7 @@ def scrape_web_content(url: str) -> Dict[str, str]:
         if not cleaned_text.strip():
             error_msg = f"Content Extraction Failed: No text content found after cleaning for {url}."
             print(f"[WebScraper] Error: {error_msg}")
-            return {"error": error_msg}
+            return {"error": error_msg, "latency": latency, "outcome": "blocked"}
         
         print(f"[WebScraper] Successfully scraped and cleaned content from {url}. Length: {len(cleaned_text)} characters.")
         max_chars = 15000
@@ -208,251 +1438,1718 @@ def scrape_web_content(url: str) -> Dict[str, str]:
             print(f"[WebScraper] Warning: Content from {url} truncated to {max_chars} characters.")
             cleaned_text = cleaned_text[:max_chars] + "\n... [Content Truncated]"
         
-        return {"content": cleaned_text}
+        return {"content": cleaned_text, "latency": latency}
     
     except requests.exceptions.Timeout:
-        error_msg = f"Scraping Error: Request timed out (>25s) for {url}."
+        error_msg = f"Scraping Error: Request timed out (>{timeout}s) for {url}."
         print(f"[WebScraper] Error: {error_msg}")
-        return {"error": error_msg}
+        return {"error": error_msg, "latency": timeout, "outcome": "failure"}
     except requests.exceptions.TooManyRedirects:
         error_msg = f"Scraping Error: Too many redirects for URL: {url}."
         print(f"[WebScraper] Error: {error_msg}")
         return {"error": error_msg}
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        error_msg = f"Scraping Error: HTTP {status} fetching URL {url}. Reason: {e}"
+        print(f"[WebScraper] Error: {error_msg}")
+        result = {"error": error_msg, "latency": latency}
+        if status is None or status >= 500 or status in DOMAIN_FAILURE_STATUSES:
+            result["outcome"] = "failure"
+        elif status in DOMAIN_BLOCKED_STATUSES:
+            result["outcome"] = "blocked"
+        return result
     except requests.exceptions.RequestException as e:
         error_msg = f"Scraping Error: Network issue fetching URL {url}. Reason: {e}"
         print(f"[WebScraper] Error: {error_msg}")
-        return {"error": error_msg}
+        return {"error": error_msg, "latency": latency, "outcome": "failure"}
     except ArticleException as e:
         error_msg = f"Scraping Error: newspaper3k failed processing {url}. Reason: {e}. Likely not a standard article format."
         print(f"[WebScraper] Warning: {error_msg}")
-        return {"error": error_msg}
+        return {"error": error_msg, "latency": latency, "outcome": "blocked"}
     except Exception as e:
         error_msg = f"Unexpected Error while scraping {url}: {type(e).__name__} - {e}"
         import traceback
         print(f"[WebScraper] Error: {error_msg}\n{traceback.format_exc()}")
         return {"error": error_msg}
 
-# --- Generate Search Queries with Gemini ---
-def generate_search_queries(research_topic: str, num_queries: int) -> List[str]:
+# --- Generate Search Queries with Gemini ---
+def generate_search_queries(research_topic: str, num_queries: int, deadline: Optional[float] = None) -> List[str]:
+    """
+    Generate diverse search queries to explore the research topic using Gemini.
+    
+    Args:
+        research_topic: The topic to research
+        num_queries: Number of search queries to generate
+        deadline: Optional absolute time by which the queries must be ready; the
+            fallback queries are used if the model cannot answer in time
+        
+    Returns:
+        List of search query strings
+    """
+    print(f"\n[SearchPlanner] Generating {num_queries} search queries for: '{research_topic}'")
+    
+    # Get the current year and month for date filtering
+    from datetime import datetime
+    current_year = datetime.now().year
+    last_year = current_year - 1
+    
+    generation_config = {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "max_output_tokens": 2048
+    }
+    
+    prompt = f"""Generate exactly {num_queries} diverse and specific search queries to thoroughly research the topic: '{research_topic}'.
+
+These queries should:
+- Cover different aspects of the topic (concepts, applications, developments, challenges, etc.)
+- Be specific and targeted rather than broad/generic
+- PRIORITIZE recent content by using date ranges for recent information
+- Use date filters extensively, especially "{last_year}..{current_year}" or "after:{last_year}"
+- Include "latest", "recent", "new", or "current" in several queries
+- Use advanced search operators where helpful (intitle:, intext:, etc.)
+- For academic topics, include queries targeting recent papers, conferences, or research publications
+
+Format your response as a Python list of strings. ONLY return the list, no other text:
+["query 1", "query 2", ...]"""
+    
+    try:
+        response_text = model_router.generate("queries", prompt, generation_config, deadline=deadline).strip()
+        
+        # Extract list from response
+        try:
+            # Try to extract a proper Python list
+            if response_text.startswith("[") and response_text.endswith("]"):
+                queries = eval(response_text)
+                if isinstance(queries, list) and all(isinstance(q, str) for q in queries):
+                    print(f"[SearchPlanner] Successfully generated {len(queries)} search queries")
+                    return queries[:num_queries]  # Ensure we don't exceed the requested number
+            
+            # If eval fails or doesn't return a list, try parsing manually
+            queries = []
+            for line in response_text.split("\n"):
+                line = line.strip()
+                if line.startswith('"') or line.startswith("'"):
+                    # Extract the query between quotes
+                    query = line.strip('"\'').strip('",\'').strip()
+                    if query:
+                        queries.append(query)
+                elif line.startswith("-") or line.startswith("*"):
+                    # Extract queries from bullet points
+                    query = line[1:].strip()
+                    if query:
+                        queries.append(query)
+            
+            if queries:
+                print(f"[SearchPlanner] Extracted {len(queries)} queries through manual parsing")
+                return queries[:num_queries]
+                
+            # If all else fails, split by commas
+            if "," in response_text:
+                queries = [q.strip() for q in response_text.split(",")]
+                print(f"[SearchPlanner] Extracted {len(queries)} queries by splitting on commas")
+                return queries[:num_queries]
+        except:
+            print(f"[SearchPlanner] Error parsing the generated queries. Using fallback method.")
+        
+        # Fallback: Generate generic queries with current date ranges
+        fallback_queries = [
+            f"{research_topic} definition AND latest developments {current_year}",
+            f"{research_topic} recent research {last_year}..{current_year}",
+            f"{research_topic} new applications case studies after:{last_year}",
+            f"{research_topic} current challenges and limitations {current_year}",
+            f"latest trends {research_topic} {current_year} expert analysis",
+            f"recent breakthroughs in {research_topic} {last_year}..{current_year}",
+            f"newest {research_topic} research papers {current_year}",
+            f"{research_topic} future implications {current_year}"
+        ]
+        print(f"[SearchPlanner] Using {num_queries} fallback queries")
+        return fallback_queries[:num_queries]
+        
+    except Exception as e:
+        print(f"[SearchPlanner] Error generating search queries: {str(e)}")
+        # Fallback queries
+        from datetime import datetime
+        current_year = datetime.now().year
+        last_year = current_year - 1
+        
+        fallback_queries = [
+            f"{research_topic} definition AND latest developments {current_year}",
+            f"{research_topic} recent research {last_year}..{current_year}",
+            f"{research_topic} new applications case studies after:{last_year}",
+            f"{research_topic} current challenges and limitations {current_year}",
+            f"latest trends {research_topic} {current_year} expert analysis",
+            f"recent breakthroughs in {research_topic} {last_year}..{current_year}",
+            f"newest {research_topic} research papers {current_year}",
+            f"{research_topic} future implications {current_year}"
+        ]
+        print(f"[SearchPlanner] Using {num_queries} fallback queries due to error")
+        return fallback_queries[:num_queries]
+
+# --- Compact Source Store ---
+# Research results are kept as one record per unique URL, with page bodies
+# interned by content hash. Large bodies are spilled to a memory-mapped
+# temporary file so long batch runs do not hold every page in memory.
+SOURCE_SPILL_THRESHOLD = 2000  # Bodies longer than this (in characters) are spilled to disk
+
+class SourceRecord:
+    """A single search result / scraped document. One instance exists per unique URL."""
+    
+    __slots__ = ("url", "title", "snippet", "date", "error", "content_key", "content_length", "scraped")
+    
+    def __init__(self, url: str, title: str = "", snippet: str = "", date: str = ""):
+        self.url = url
+        self.title = title
+        self.snippet = snippet
+        self.date = date
+        self.error = ""
+        self.content_key = None
+        self.content_length = 0
+        self.scraped = False
+    
+    def to_search_result(self) -> Dict[str, str]:
+        """Returns the record in the dictionary format produced by google_search."""
+        return {"title": self.title, "link": self.url, "snippet": self.snippet, "date": self.date}
+
+class SourceStore:
+    """
+    Holds the queries, search results and scraped content for one research run.
+    
+    Each URL is stored once no matter how many queries returned it, and identical
+    page bodies are stored once no matter how many URLs served them.
+    """
+    
+    def __init__(self, spill_threshold: int = SOURCE_SPILL_THRESHOLD):
+        self.spill_threshold = spill_threshold
+        self._records = {}      # url -> SourceRecord, in insertion order
+        self._queries = []      # [(query, [url, ...])] in search rank order
+        self._bodies = {}       # content hash -> str (in memory) or (offset, length) (spilled)
+        self._spill_file = None
+        self._spill_size = 0
+        self._spill_map = None
+        self._corpus_file = None    # Plain JSONL corpus whose bodies are read lazily
+        self._corpus_map = None
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def close(self) -> None:
+        """Releases the spill file and any attached corpus file."""
+        with self._lock:
+            if self._spill_map is not None:
+                self._spill_map.close()
+                self._spill_map = None
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+            if self._corpus_map is not None:
+                self._corpus_map.close()
+                self._corpus_map = None
+            if self._corpus_file is not None:
+                self._corpus_file.close()
+                self._corpus_file = None
+    
+    def attach_corpus(self, path: str) -> None:
+        """Memory-maps a plain JSONL corpus file so bodies registered with set_lazy_content can be read on demand."""
+        self._corpus_file = open(path, "rb")
+        self._corpus_map = mmap.mmap(self._corpus_file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def set_lazy_content(self, record: SourceRecord, content_key: str, content_length: int,
+                         line_offset: int, line_length: int) -> None:
+        """Points a record at a body stored as a JSON line in the attached corpus file, without reading it."""
+        record.scraped = True
+        record.content_key = content_key
+        record.content_length = content_length
+        with self._lock:
+            self._bodies.setdefault(content_key, ("corpus", line_offset, line_length))
+    
+    def add_query(self, query: str) -> int:
+        """Registers a search query and returns its id."""
+        self._queries.append((query, []))
+        return len(self._queries) - 1
+    
+    def add_search_result(self, query_id: int, result: Dict[str, str]) -> SourceRecord:
+        """
+        Adds a search result under the given query.
+        
+        Returns:
+            The existing record if the URL was already seen, otherwise a new one
+        """
+        url = result.get("link", "")
+        record = self._records.get(url)
+        if record is None:
+            record = SourceRecord(
+                url,
+                title=result.get("title", ""),
+                snippet=result.get("snippet", ""),
+                date=result.get("date", ""),
+            )
+            self._records[url] = record
+        urls = self._queries[query_id][1]
+        if url not in urls:
+            urls.append(url)
+        return record
+    
+    def set_content(self, record: SourceRecord, content: str, error: str = "", date: Optional[str] = None) -> None:
+        """Stores the scraped body (or error) for a record."""
+        record.scraped = True
+        record.error = error
+        if date is not None:
+            record.date = date
+        if not content:
+            record.content_key = None
+            record.content_length = 0
+            return
+        
+        content_key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        with self._lock:
+            if content_key not in self._bodies:
+                if len(content) > self.spill_threshold:
+                    self._bodies[content_key] = self._spill(content)
+                else:
+                    self._bodies[content_key] = content
+        record.content_key = content_key
+        record.content_length = len(content)
+    
+    def _spill(self, content: str) -> tuple:
+        """Appends a body to the spill file and returns its (offset, length). Caller holds the lock."""
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="gemini_research_sources_")
+        data = content.encode("utf-8")
+        offset = self._spill_size
+        self._spill_file.seek(offset)
+        self._spill_file.write(data)
+        self._spill_size += len(data)
+        return (offset, len(data))
+    
+    def get_content(self, record: SourceRecord) -> str:
+        """Returns the scraped body of a record, or an empty string if there is none."""
+        if record.content_key is None:
+            return ""
+        with self._lock:
+            body = self._bodies[record.content_key]
+            if isinstance(body, str):
+                return body
+            if len(body) == 3:
+                _, offset, length = body
+                return json.loads(self._corpus_map[offset:offset + length])["content"]
+            offset, length = body
+            # Remap when the file has grown past the current mapping
+            if self._spill_map is None or len(self._spill_map) < offset + length:
+                if self._spill_map is not None:
+                    self._spill_map.close()
+                self._spill_file.flush()
+                self._spill_map = mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._spill_map[offset:offset + length].decode("utf-8")
+    
+    def records(self) -> List[SourceRecord]:
+        """Returns every unique record in the order it was first seen."""
+        return list(self._records.values())
+    
+    def get_record(self, url: str) -> Optional[SourceRecord]:
+        """Returns the record for a URL, if present."""
+        return self._records.get(url)
+    
+    def queries(self) -> List[tuple]:
+        """Returns (query, [SourceRecord, ...]) pairs in the order the queries were run."""
+        return [(query, [self._records[url] for url in urls]) for query, urls in self._queries]
+    
+    def _context_layout(self, snippet_fallback: bool = False) -> List[tuple]:
+        """
+        Returns (query, [records]) pairs as they appear in the context: each record with content
+        once, under its first query. With snippet_fallback, records without content but with a
+        search snippet are included too.
+        """
+        layout = []
+        emitted = set()
+        for query, urls in self._queries:
+            records = []
+            for url in urls:
+                record = self._records[url]
+                if url in emitted:
+                    continue
+                if record.content_key is None and not (snippet_fallback and record.snippet):
+                    continue
+                emitted.add(url)
+                records.append(record)
+            layout.append((query, records))
+        return layout
+    
+    def numbered_sources(self, snippet_fallback: bool = False) -> List[SourceRecord]:
+        """Returns the records in the order they are numbered ('Source 1', 'Source 2', ...) in build_context."""
+        return [record for _, records in self._context_layout(snippet_fallback) for record in records]
+    
+    def build_context(self, research_topic: str, max_content_chars: int = 10000,
+                      summaries: Optional[Dict[str, str]] = None, snippet_fallback: bool = False) -> str:
+        """
+        Builds the research-data context passed to the synthesis prompts.
+        
+        Each document appears once, under the first query that returned it.
+        
+        Args:
+            research_topic: The research topic
+            max_content_chars: Per-source limit on included body (or summary) text
+            summaries: Optional URL -> fact sheet mapping used in place of the raw body
+            snippet_fallback: Include sources that were not scraped, using their search snippet
+            
+        Returns:
+            The assembled context string
+        """
+        parts = [f"# Research Topic: {research_topic}\n\n"]
+        source_count = 0
+        for query, records in self._context_layout(snippet_fallback):
+            parts.append(f"## Search Query: {query}\n\n")
+            for record in records:
+                content = self.get_content(record)
+                if summaries and record.url in summaries:
+                    content = summaries[record.url]
+                elif not content:
+                    content = f"(Search snippet only) {record.snippet}"
+                source_count += 1
+                parts.append(f"### Source {source_count}: {record.title or 'No title'}\n")
+                parts.append(f"URL: {record.url}\n")
+                parts.append(f"Date: {record.date or 'Date not available'}\n\n")
+                # Limit content length to avoid exceeding model context
+                if len(content) > max_content_chars:
+                    parts.append(content[:max_content_chars])
+                    parts.append("...\n\n")
+                else:
+                    parts.append(content)
+                    parts.append("\n\n")
+        return "".join(parts)
+    
+    def to_research_data(self) -> List[Dict[str, Any]]:
+        """Expands the store into the legacy nested research_data format."""
+        research_data = []
+        for query, records in self.queries():
+            research_data.append({
+                "query": query,
+                "search_results": [record.to_search_result() for record in records],
+                "scraped_content": [{
+                    "title": record.title,
+                    "url": record.url,
+                    "snippet": record.snippet,
+                    "content": self.get_content(record),
+                    "error": record.error,
+                    "date": record.date,
+                } for record in records if record.scraped],
+            })
+        return research_data
+    
+    @classmethod
+    def from_research_data(cls, research_data: List[Dict[str, Any]], spill_threshold: int = SOURCE_SPILL_THRESHOLD) -> "SourceStore":
+        """Builds a store from the legacy nested research_data format."""
+        store = cls(spill_threshold=spill_threshold)
+        for query_data in research_data:
+            query_id = store.add_query(query_data.get("query", ""))
+            for result in query_data.get("search_results", []):
+                store.add_search_result(query_id, result)
+            for item in query_data.get("scraped_content", []):
+                record = store.add_search_result(query_id, {
+                    "title": item.get("title", ""),
+                    "link": item.get("url", ""),
+                    "snippet": item.get("snippet", ""),
+                    "date": item.get("date", ""),
+                })
+                if not record.scraped or (item.get("content") and record.content_key is None):
+                    store.set_content(record, item.get("content", ""), item.get("error", ""), item.get("date"))
+        return store
+    
+    def memory_stats(self) -> Dict[str, int]:
+        """Returns counts of records, unique bodies and in-memory vs spilled (or lazily loaded) bodies."""
+        with self._lock:
+            in_memory = sum(len(body) for body in self._bodies.values() if isinstance(body, str))
+            spilled = sum(1 for body in self._bodies.values() if isinstance(body, tuple) and len(body) == 2)
+            lazy = sum(1 for body in self._bodies.values() if isinstance(body, tuple) and len(body) == 3)
+            return {
+                "records": len(self._records),
+                "unique_bodies": len(self._bodies),
+                "spilled_bodies": spilled,
+                "lazy_bodies": lazy,
+                "in_memory_chars": in_memory,
+                "spilled_bytes": self._spill_size,
+            }
+
+# --- Source Summarization (Map Stage) ---
+# Optionally condenses each scraped page into a short, citation-tagged fact
+# sheet using a faster model, so the synthesis prompts can cover every source
+# instead of the first few pages of raw text.
+SUMMARY_MAX_WORKERS = 4
+SUMMARY_CONTEXT_BUDGET = 15000  # Total characters of fact sheets passed to each synthesis prompt
+SUMMARY_MIN_CHARS_PER_SOURCE = 300
+
+def _citation_year(date: str) -> str:
+    """Extracts a year from a source date for use in citations."""
+    match = re.search(r'\b(19|20)\d{2}\b', date or "")
+    return match.group(0) if match else "n.d."
+
+class SourceSummarizer:
+    """
+    Summarizes scraped documents concurrently while the scrape stage is still running.
+    
+    Summaries are cached on disk by content hash (together with the model and
+    topic), so unchanged pages are never summarized twice. Under a run deadline,
+    no summary call runs past the time kept back for writing the report.
+    """
+    
+    def __init__(self, research_topic: str, max_workers: int = SUMMARY_MAX_WORKERS,
+                 cache_dir: Optional[str] = CACHE_DIR, deadline: Optional[RunDeadline] = None):
+        self.research_topic = research_topic
+        self.deadline = deadline
+        self.model_name = model_router.primary_model("summary")
+        self.cache_dir = os.path.join(cache_dir, "summaries") if cache_dir else None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = {}  # url -> Future[str]
+        self._futures_by_content = {}  # content hash -> Future[str], so mirrored pages are summarized once
+        self._cache_hits = 0
+        self._lock = threading.Lock()
+    
+    def _cache_key(self, content_key: str) -> str:
+        key_material = f"{self.model_name}\n{self.research_topic}\n{content_key}"
+        return hashlib.sha1(key_material.encode("utf-8")).hexdigest()
+    
+    def _read_cache(self, cache_key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{cache_key}.md")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _write_cache(self, cache_key: str, summary: str) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{cache_key}.md")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(summary)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Summarizer] Warning: Could not write summary cache: {e}")
+    
+    def submit(self, record: SourceRecord, content: str) -> None:
+        """Queues a scraped document for summarization (no-op for empty or already queued documents)."""
+        if not content or record.content_key is None:
+            return
+        with self._lock:
+            if record.url in self._futures:
+                return
+            future = self._futures_by_content.get(record.content_key)
+            if future is None:
+                future = self._executor.submit(
+                    self._summarize, record.title, record.url, record.date, record.content_key, content)
+                self._futures_by_content[record.content_key] = future
+            self._futures[record.url] = future
+    
+    def _summarize(self, title: str, url: str, date: str, content_key: str, content: str) -> str:
+        """Produces the fact sheet for a single document."""
+        cache_key = self._cache_key(content_key)
+        cached = self._read_cache(cache_key)
+        if cached is not None:
+            with self._lock:
+                self._cache_hits += 1
+            return cached
+        
+        citation = f"[{title or urlparse(url).netloc}, {_citation_year(date)}]"
+        prompt = f"""Summarize the following web page into a compact fact sheet for a research report on '{self.research_topic}'.
+
+Rules:
+- Write 5-10 bullet points, most important first
+- Each bullet is one concrete fact, finding, figure, date or claim from the page
+- Keep names, numbers and dates exactly as written in the page
+- End every bullet with the citation tag {citation}
+- Ignore navigation text, advertisements and content unrelated to the topic
+- If the page has nothing relevant to the topic, return a single bullet saying so
+
+Page title: {title}
+URL: {url}
+Date: {date}
+
+Page content:
+{content}
+
+Return ONLY the bullet list."""
+        
+        summary, answered_by = model_router.generate_with_model("summary", prompt, {
+            "temperature": 0.1,
+            "max_output_tokens": 1024
+        }, deadline=self.deadline.end - self.deadline.reserve if self.deadline is not None else None)
+        summary = summary.strip()
+        # The cache is keyed on the primary model; a fallback model's summary is used but not kept
+        if answered_by == self.model_name:
+            self._write_cache(cache_key, summary)
+        return summary
+    
+    def results(self, timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        Waits for all queued summaries.
+        
+        Args:
+            timeout: Optional seconds to wait in total; summaries still running then are left out
+        
+        Returns:
+            Dictionary mapping URL to fact sheet. Documents whose summary failed or did not
+            finish in time are omitted.
+        """
+        summaries = {}
+        with self._lock:
+            futures = dict(self._futures)
+        wait_until = time.time() + timeout if timeout is not None else None
+        for url, future in futures.items():
+            try:
+                remaining = max(0.0, wait_until - time.time()) if wait_until is not None else None
+                summaries[url] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                print(f"[Summarizer] Summary of {url} not ready in time. Using raw content instead.")
+            except Exception as e:
+                print(f"[Summarizer] Error summarizing {url}: {e}. Using raw content instead.")
+        print(f"[Summarizer] Summarized {len(summaries)}/{len(futures)} sources ({self._cache_hits} from cache)")
+        return summaries
+    
+    def close(self) -> None:
+        """Shuts down the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# --- Incremental Research State ---
+# For recurring topics, the previous run's queries, corpus and generated
+# report parts are kept on disk. The next run reuses documents whose search
+# listing has not changed, and report parts whose prompt and model are the
+# same and whose cited sources are unchanged and numbered as before.
+INCREMENTAL_STATE_VERSION = 2
+
+class IncrementalState:
+    """
+    Stored state of the previous run on a topic, plus what the current run produced.
+    
+    Args:
+        research_topic: The research topic (state is keyed by its normalized text)
+        cache_dir: Base directory for stored state
+    """
+    
+    def __init__(self, research_topic: str, cache_dir: str = CACHE_DIR):
+        topic_key = hashlib.sha1(" ".join(research_topic.lower().split()).encode("utf-8")).hexdigest()[:16]
+        self.research_topic = research_topic
+        self.path = os.path.join(cache_dir, "incremental", f"{topic_key}.json")
+        self.queries = []
+        self._documents = {}        # url -> stored document from the previous run
+        self._sections = {}         # part key -> {"text", "date", "sources", "evidence"} from the previous run
+        self._fingerprints = {}     # url -> search listing fingerprint seen this run
+        self._used_sections = {}
+        self.stats = {"documents_reused": 0, "documents_fetched": 0, "sections_reused": 0, "sections_generated": 0}
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            print(f"[Incremental] No previous run found for '{self.research_topic}'. Running a full build.")
+            return
+        if state.get("version") != INCREMENTAL_STATE_VERSION:
+            print(f"[Incremental] Ignoring stored state with incompatible version {state.get('version')}")
+            return
+        self.queries = state.get("queries", [])
+        self._documents = state.get("documents", {})
+        self._sections = state.get("sections", {})
+        print(f"[Incremental] Loaded previous run from {state.get('updated', 'unknown date')}: "
+              f"{len(self._documents)} documents, {len(self._sections)} report parts")
+    
+    @staticmethod
+    def fingerprint(result: Dict[str, str]) -> str:
+        """Fingerprint of a search listing; a change suggests the page itself changed."""
+        listing = "\n".join([result.get("title", ""), result.get("snippet", ""), result.get("date", "")])
+        return hashlib.sha1(listing.encode("utf-8")).hexdigest()
+    
+    def reuse_document(self, result: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Returns the stored document for a search result if its listing is unchanged, otherwise None.
+        
+        Documents that failed to scrape last time are always fetched again.
+        """
+        url = result.get("link", "")
+        fingerprint = self.fingerprint(result)
+        with self._lock:
+            self._fingerprints[url] = fingerprint
+            previous = self._documents.get(url)
+            if previous and previous.get("fingerprint") == fingerprint and previous.get("content"):
+                self.stats["documents_reused"] += 1
+                return previous
+            self.stats["documents_fetched"] += 1
+            return None
+    
+    def register_documents(self, store: SourceStore) -> None:
+        """Records the listing fingerprints of documents that did not come through execute_research (e.g. a loaded corpus)."""
+        with self._lock:
+            for record in store.records():
+                self._fingerprints.setdefault(record.url, self.fingerprint(record.to_search_result()))
+    
+    @staticmethod
+    def evidence_key(*parts: Any) -> str:
+        """Builds the key identifying a report part (stage, prompt, model, ...) independent of its source data."""
+        return hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    
+    def get_section(self, key: str, current_date: str, source_versions: Dict[str, list],
+                    evidence_hash: str) -> Optional[str]:
+        """
+        Returns a stored report part with its date refreshed, or None if its evidence changed.
+        
+        Args:
+            key: Part key from evidence_key
+            current_date: Today's date, substituted for the stored part's date
+            source_versions: url -> [source number, content hash] for the sources in this run's context
+            evidence_hash: Hash of the research data in the part's prompt, used for parts that cited no source
+        """
+        with self._lock:
+            entry = self._sections.get(key)
+            if entry is None:
+                return None
+            cited = entry.get("sources") or {}
+            if cited:
+                # Reusable while every cited source has the same content and the same "Source N" number
+                if any(source_versions.get(url) != version for url, version in cited.items()):
+                    return None
+            elif entry.get("evidence") != evidence_hash:
+                return None
+            self._used_sections[key] = entry
+            self.stats["sections_reused"] += 1
+        text = entry["text"]
+        if entry.get("date") and entry["date"] != current_date:
+            text = text.replace(entry["date"], current_date)
+        return text
+    
+    def put_section(self, key: str, text: str, current_date: str, cited_sources: Dict[str, list],
+                    evidence_hash: str) -> None:
+        """Records a newly generated report part with the versions of the sources it cites."""
+        with self._lock:
+            self._used_sections[key] = {"text": text, "date": current_date,
+                                        "sources": cited_sources, "evidence": evidence_hash}
+            self.stats["sections_generated"] += 1
+    
+    def save(self, store: SourceStore, queries: List[str]) -> None:
+        """Writes this run's queries, corpus and report parts, replacing the previous run's state."""
+        documents = {}
+        for record in store.records():
+            fingerprint = self._fingerprints.get(record.url)
+            content = store.get_content(record)
+            if fingerprint is None or not content:
+                continue
+            documents[record.url] = {
+                "fingerprint": fingerprint,
+                "title": record.title,
+                "snippet": record.snippet,
+                "date": record.date,
+                "content": content,
+            }
+        state = {
+            "version": INCREMENTAL_STATE_VERSION,
+            "topic": self.research_topic,
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "queries": list(queries),
+            "documents": documents,
+            "sections": self._used_sections,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            print(f"[Incremental] Saved {len(documents)} documents and {len(self._used_sections)} report parts to {self.path}")
+        except OSError as e:
+            print(f"[Incremental] Warning: Could not save incremental state: {e}")
+
+# --- Corpus Export/Import ---
+# A research corpus (queries, search results and extracted documents) can be
+# saved after the research phase and re-synthesized later without searching or
+# scraping again. The format is JSONL: a header line, one line per query, one
+# per document and finally one per unique body, so bodies can be skipped
+# while reading metadata. Files ending in .gz or .zst are compressed.
+CORPUS_VERSION = 1
+
+try:
+    import zstandard  # Optional, only needed for .zst corpora
+except ImportError:
+    zstandard = None
+
+_CORPUS_CONTENT_PREFIX = re.compile(rb'^\{"type": "content", "hash": "([0-9a-f]+)", "length": (\d+),')
+
+def _open_corpus(path: str, mode: str):
+    """Opens a corpus file for text reading ('r') or writing ('w'), handling compression by extension."""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError("Reading or writing .zst corpora requires the optional 'zstandard' package")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def save_corpus(store: SourceStore, path: str, research_topic: str) -> None:
+    """
+    Writes a research corpus so it can be re-synthesized with --from-corpus.
+    
+    The corpus is written to a temporary file next to path and moved into place
+    when complete, so overwriting the corpus the store was loaded from (and is
+    still reading bodies from) is safe, and a failed write leaves no partial file.
+    
+    Args:
+        store: SourceStore produced by execute_research
+        path: Output path (.jsonl, .jsonl.gz or .jsonl.zst)
+        research_topic: The research topic
+    """
+    queries = store.queries()
+    records = store.records()
+    # The temporary name keeps the original suffix so the same compression is used
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-",
+                                    suffix="-" + os.path.basename(path))
+    os.close(fd)
+    try:
+        written = _write_corpus(store, tmp_path, research_topic, queries, records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    print(f"[Corpus] Saved {len(queries)} queries, {len(records)} documents and {written} bodies to {path}")
+
+def _write_corpus(store: SourceStore, path: str, research_topic: str, queries: List[tuple],
+                  records: List[SourceRecord]) -> int:
+    """Writes the corpus lines for save_corpus and returns the number of bodies written."""
+    with _open_corpus(path, "w") as f:
+        f.write(json.dumps({
+            "type": "header",
+            "version": CORPUS_VERSION,
+            "topic": research_topic,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "queries": len(queries),
+            "documents": len(records),
+        }) + "\n")
+        for query_id, (query, query_records) in enumerate(queries):
+            f.write(json.dumps({"type": "query", "id": query_id, "query": query,
+                                "results": [record.url for record in query_records]}) + "\n")
+        for record in records:
+            f.write(json.dumps({
+                "type": "document",
+                "url": record.url,
+                "title": record.title,
+                "snippet": record.snippet,
+                "date": record.date,
+                "error": record.error,
+                "scraped": record.scraped,
+                "hash": record.content_key,
+                "length": record.content_length,
+            }) + "\n")
+        written = set()
+        for record in records:
+            if record.content_key is None or record.content_key in written:
+                continue
+            written.add(record.content_key)
+            # Key order matters: readers match the hash and length without decoding the body
+            f.write(json.dumps({"type": "content", "hash": record.content_key, "length": record.content_length,
+                                "content": store.get_content(record)}) + "\n")
+    return len(written)
+
+def load_corpus(path: str) -> tuple:
+    """
+    Loads a research corpus written by save_corpus.
+    
+    Plain .jsonl corpora are memory-mapped and bodies are only decoded when a
+    prompt needs them. Compressed corpora are streamed into the store, which
+    spills large bodies to disk as usual.
+    
+    Args:
+        path: Corpus path
+        
+    Returns:
+        Tuple of (SourceStore, header dict)
+    """
+    store = SourceStore()
+    documents = {}
+    pending_queries = []
+    bodies_by_hash = {}  # content hash -> [records]
+    lazy = not (path.endswith(".gz") or path.endswith(".zst"))
+    
+    def add_metadata(entry: Dict[str, Any]) -> None:
+        if entry["type"] == "query":
+            pending_queries.append(entry)
+        elif entry["type"] == "document":
+            documents[entry["url"]] = entry
+    
+    def register_queries() -> None:
+        # Queries reference documents, so records are created once all metadata has been read
+        for entry in pending_queries:
+            query_id = store.add_query(entry["query"])
+            for url in entry.get("results", []):
+                doc = documents.get(url, {})
+                record = store.add_search_result(query_id, {"link": url, "title": doc.get("title", ""),
+                                                            "snippet": doc.get("snippet", ""), "date": doc.get("date", "")})
+                record.scraped = doc.get("scraped", False)
+                record.error = doc.get("error", "")
+        pending_queries.clear()
+        for url, doc in documents.items():
+            record = store.get_record(url)
+            if record is not None and doc.get("hash"):
+                bodies_by_hash.setdefault(doc["hash"], []).append(record)
+    
+    header = None
+    if lazy:
+        store.attach_corpus(path)
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                line_length = len(line)
+                match = _CORPUS_CONTENT_PREFIX.match(line)
+                if match:
+                    if pending_queries:
+                        register_queries()
+                    content_key = match.group(1).decode("ascii")
+                    for record in bodies_by_hash.get(content_key, []):
+                        store.set_lazy_content(record, content_key, int(match.group(2)), offset, line_length)
+                elif line.strip():
+                    entry = json.loads(line)
+                    if entry["type"] == "header":
+                        header = entry
+                    else:
+                        add_metadata(entry)
+                offset += line_length
+    else:
+        with _open_corpus(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["type"] == "header":
+                    header = entry
+                elif entry["type"] == "content":
+                    if pending_queries:
+                        register_queries()
+                    for record in bodies_by_hash.get(entry["hash"], []):
+                        store.set_content(record, entry["content"], record.error)
+                else:
+                    add_metadata(entry)
+    if pending_queries:
+        register_queries()
+    
+    if header is None or header.get("version") != CORPUS_VERSION:
+        store.close()
+        raise ValueError(f"{path} is not a version {CORPUS_VERSION} research corpus")
+    stats = store.memory_stats()
+    print(f"[Corpus] Loaded {len(store.queries())} queries and {stats['records']} documents from {path} "
+          f"({stats['unique_bodies']} bodies{', read on demand' if lazy else ''})")
+    return store, header
+
+# --- Distributed Scrape Queue ---
+# In worker mode the coordinator puts fetch/extract tasks on a SQLite queue
+# (which may live on a shared filesystem) and any number of
+# `gemini_research.py worker` processes claim them under time-limited leases.
+# Workers renew the lease while a scrape is running; tasks whose worker dies
+# are retried once their lease expires. Each job carries the coordinator's
+# HTTP and hedging settings so queued scrapes behave like in-process ones.
+QUEUE_LEASE_SECONDS = 120
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_POLL_INTERVAL = 1.0
+
+class ScrapeTaskQueue:
+    """
+    SQLite-backed queue of scrape tasks shared by a coordinator and its workers.
+    
+    Args:
+        path: Path of the SQLite database file
+        lease_seconds: How long a claimed task stays reserved for its worker
+        max_attempts: Claims allowed per task before it is marked as failed
+    """
+    
+    def __init__(self, path: str, lease_seconds: float = QUEUE_LEASE_SECONDS, max_attempts: int = QUEUE_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job TEXT NOT NULL,
+                url TEXT NOT NULL,
+                query_id INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                result TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (job, url)
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                job TEXT PRIMARY KEY,
+                settings TEXT NOT NULL
+            )""")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+    
+    def set_job_settings(self, job: str, settings: Dict[str, Any]) -> None:
+        """Stores the scrape settings workers should use for a job's tasks."""
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR REPLACE INTO jobs (job, settings) VALUES (?, ?)", (job, json.dumps(settings)))
+    
+    def job_settings(self, job: str) -> Dict[str, Any]:
+        """Returns a job's scrape settings (empty if the coordinator stored none)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT settings FROM jobs WHERE job = ?", (job,)).fetchone()
+        return json.loads(row[0]) if row else {}
+    
+    def enqueue(self, job: str, url: str, query_id: int) -> None:
+        """Adds a task (ignored if the job already has a task for the URL)."""
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR IGNORE INTO tasks (job, url, query_id, updated) VALUES (?, ?, ?, ?)",
+                         (job, url, query_id, time.time()))
+    
+    def claim(self, job: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Claims the oldest available task, optionally restricted to one job.
+        
+        Available tasks are pending ones and leased ones whose lease has expired.
+        Tasks that have used up their attempts are marked as failed instead.
+        
+        Returns:
+            Dictionary with 'id', 'job', 'url' and 'query_id', or None if nothing is available
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', result = ?, updated = ? "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (json.dumps({"error": "Task abandoned: worker lease expired too many times."}), now, now, self.max_attempts))
+                job_filter = "AND job = ?" if job else ""
+                params = (now, job) if job else (now,)
+                row = conn.execute(
+                    "SELECT id, job, url, query_id FROM tasks "
+                    f"WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) {job_filter} "
+                    "ORDER BY id LIMIT 1", params).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated = ? WHERE id = ?",
+                    (self.worker_id, now + self.lease_seconds, now, row[0]))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return {"id": row[0], "job": row[1], "url": row[2], "query_id": row[3]}
+    
+    def complete(self, task_id: int, result: Dict[str, str]) -> bool:
+        """
+        Stores a task's result. Only the current lease holder can complete a task.
+        
+        Returns:
+            True if the result was stored, False if the lease had been lost to another worker
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, updated = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result), time.time(), task_id, self.worker_id))
+            return cursor.rowcount == 1
+    
+    def renew(self, task_id: int) -> bool:
+        """
+        Extends the lease on a task this worker holds.
+        
+        Returns:
+            True if the lease was extended, False if it had already been lost
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, time.time(), task_id, self.worker_id))
+            return cursor.rowcount == 1
+    
+    def collect(self, job: str, exclude: set) -> List[Dict[str, Any]]:
+        """Returns finished ('done' or 'failed') tasks of a job whose ids are not in exclude."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, url, query_id, status, result FROM tasks WHERE job = ? AND status IN ('done', 'failed')",
+                (job,)).fetchall()
+        return [{"id": row[0], "url": row[1], "query_id": row[2], "status": row[3], "result": json.loads(row[4] or "{}")}
+                for row in rows if row[0] not in exclude]
+    
+    def outstanding(self, job: str) -> int:
+        """Returns the number of a job's tasks that have not finished."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE job = ? AND status IN ('pending', 'leased')",
+                                (job,)).fetchone()[0]
+    
+    def purge(self, job: str) -> None:
+        """Deletes all tasks of a finished job."""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM tasks WHERE job = ?", (job,))
+            conn.execute("DELETE FROM jobs WHERE job = ?", (job,))
+
+def scrape_settings() -> Dict[str, Any]:
+    """Returns this process's HTTP session and hedging settings, for workers to copy."""
+    with _http_lock:
+        settings = dict(_http_config)
+    settings["hedge"] = scrape_hedging_enabled
+    return settings
+
+def apply_scrape_settings(settings: Dict[str, Any]) -> None:
+    """Adopts a coordinator's scrape settings (no-op when they are empty or already in effect)."""
+    global scrape_hedging_enabled
+    if not settings or settings == scrape_settings():
+        return
+    configure_http_session(
+        per_host_connections=settings.get("per_host_connections", HTTP_PER_HOST_CONNECTIONS),
+        connect_retries=settings.get("connect_retries", HTTP_CONNECT_RETRIES),
+        http2=settings.get("http2", False),
+        pool_hosts=settings.get("pool_hosts", HTTP_POOL_HOSTS),
+    )
+    scrape_hedging_enabled = settings.get("hedge", True)
+    print(f"[Worker] Using coordinator scrape settings: {settings}")
+
+def run_scrape_task(task_queue: ScrapeTaskQueue, task: Dict[str, Any], max_timeout: Optional[float] = None) -> None:
+    """
+    Scrapes a claimed task's URL, renewing its lease meanwhile, and writes the result back to the queue.
+    
+    Args:
+        max_timeout: Optional cap on the whole fetch, e.g. the time left before the coordinator's deadline
+    """
+    print(f"[Worker] {task_queue.worker_id} processing task {task['id']}: {task['url']}")
+    stop_renewing = threading.Event()
+    
+    def renew_lease() -> None:
+        while not stop_renewing.wait(task_queue.lease_seconds / 3):
+            if not task_queue.renew(task["id"]):
+                return
+    
+    renewer = threading.Thread(target=renew_lease, daemon=True)
+    renewer.start()
+    try:
+        result = scrape_web_content(task["url"], max_timeout=max_timeout)
+    finally:
+        stop_renewing.set()
+        renewer.join()
+    stored = {"content": result.get("content", ""), "error": result.get("error", "")}
+    if not task_queue.complete(task["id"], stored):
+        print(f"[Worker] Lease on task {task['id']} expired before completion; result discarded")
+
+def worker_main(argv: List[str]) -> None:
+    """Entry point for `gemini_research.py worker`: claims and runs scrape tasks until stopped."""
+    parser = argparse.ArgumentParser(prog="gemini_research.py worker",
+                                     description="Scrape worker for distributed research runs")
+    parser.add_argument("--queue", required=True, help="Path of the shared SQLite task queue")
+    parser.add_argument("--lease", type=float, default=QUEUE_LEASE_SECONDS,
+                        help=f"Seconds a claimed task stays reserved (default: {QUEUE_LEASE_SECONDS})")
+    parser.add_argument("--idle-exit", type=float, default=None,
+                        help="Exit after this many seconds without tasks (default: run until interrupted)")
+    parser.add_argument("--no-domain-health", action="store_true",
+                        help="Disable per-domain adaptive timeouts and circuit breakers")
+    args = parser.parse_args(argv)
+    
+    configure_domain_health(enabled=not args.no_domain_health)
+    configure_http_session()
+    task_queue = ScrapeTaskQueue(args.queue, lease_seconds=args.lease)
+    print(f"[Worker] {task_queue.worker_id} waiting for tasks on {args.queue}")
+    
+    idle_since = time.time()
+    processed = 0
+    try:
+        while True:
+            task = task_queue.claim()
+            if task is None:
+                if args.idle_exit is not None and time.time() - idle_since > args.idle_exit:
+                    break
+                time.sleep(QUEUE_POLL_INTERVAL)
+                continue
+            apply_scrape_settings(task_queue.job_settings(task["job"]))
+            run_scrape_task(task_queue, task)
+            processed += 1
+            idle_since = time.time()
+            if domain_health is not None and processed % 10 == 0:
+                domain_health.save()
+    except KeyboardInterrupt:
+        print("\n[Worker] Interrupted")
+    finally:
+        if domain_health is not None:
+            domain_health.save()
+    print(f"[Worker] {task_queue.worker_id} processed {processed} tasks")
+
+# --- Pre-Scrape Reranking ---
+# Search results from all queries are scored locally before anything is
+# fetched, so the scrape budget goes to the most relevant, recent and
+# reputable candidates instead of whatever the API listed first.
+RERANK_TOP_K = {1: 6, 2: 15, 3: 32}        # Documents scraped per depth when reranking
+RERANK_WEIGHTS = {"lexical": 0.55, "recency": 0.25, "rank": 0.10}
+RERANK_DUPLICATE_PENALTY = 0.5              # Multiplied by title/snippet overlap with an already selected result
+RERANK_SAME_DOMAIN_PENALTY = 0.08           # Per already selected result from the same domain
+RERANK_RECENCY_HALF_LIFE = 2.0              # Years
+RERANK_TRUSTED_DOMAINS = ("arxiv.org", "nature.com", "science.org", "sciencedirect.com", "springer.com",
+                          "ieee.org", "acm.org", "nih.gov", "who.int", "wiley.com", "pnas.org", "cell.com",
+                          "oecd.org", "worldbank.org", "reuters.com", "apnews.com")
+RERANK_LOW_VALUE_DOMAINS = ("reddit.com", "quora.com", "pinterest.com", "facebook.com", "twitter.com", "x.com",
+                            "instagram.com", "tiktok.com", "youtube.com", "linkedin.com", "answers.com")
+RERANK_LOW_VALUE_PATHS = ("/forum", "/forums/", "/thread", "/tag/", "/tags/", "/search", "/login", "/category/")
+_RERANK_STOPWORDS = {"the", "a", "an", "of", "and", "in", "on", "for", "to", "from", "at", "by", "with", "is", "are",
+                     "what", "how", "why", "latest", "recent", "new", "current", "after", "before", "or", "vs"}
+
+def _rerank_tokens(text: str) -> List[str]:
+    # Drop search operators such as after:2023 or site:example.com before tokenizing
+    text = re.sub(r'\b\w+:\S+', ' ', text.lower())
+    return [token for token in re.findall(r'[a-z0-9]+', text) if token not in _RERANK_STOPWORDS and len(token) > 1]
+
+def _recency_score(date: str) -> float:
+    """Scores a search result date from 1.0 (now) decaying with age; undated results get a neutral 0.3."""
+    match = re.search(r'\b((?:19|20)\d{2})(?:-(\d{2}))?', date or "")
+    if not match:
+        return 0.3
+    now = time.localtime()
+    age_years = (now.tm_year + (now.tm_mon - 1) / 12) - (int(match.group(1)) + (int(match.group(2) or 7) - 1) / 12)
+    return 0.5 ** (max(0.0, age_years) / RERANK_RECENCY_HALF_LIFE)
+
+def _domain_prior(url: str) -> float:
+    """Returns a score adjustment for a result's domain and path."""
+    domain = DomainHealthTracker.domain_of(url)
+    path = urlparse(url).path.lower()
+    if any(domain == d or domain.endswith("." + d) for d in RERANK_LOW_VALUE_DOMAINS):
+        return -0.3
+    prior = 0.0
+    if any(domain == d or domain.endswith("." + d) for d in RERANK_TRUSTED_DOMAINS):
+        prior += 0.15
+    elif re.search(r'\.(gov|edu|int|mil)$|\.(ac|gov|edu)\.[a-z]{2}$', domain):
+        prior += 0.12
+    if any(marker in path for marker in RERANK_LOW_VALUE_PATHS):
+        prior -= 0.2
+    return prior
+
+def rerank_candidates(research_topic: str, candidates: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Scores search results from all queries and selects the top_k to scrape.
+    
+    Scores combine BM25 relevance of title and snippet to the topic and query,
+    recency of the result date, API rank and domain priors. Selection is greedy,
+    penalizing results that duplicate or share a domain with already selected ones.
+    
+    Args:
+        research_topic: The research topic
+        candidates: Dictionaries with 'query', 'rank' (0-based within its query) and 'result' (a google_search
+            result); other keys are passed through
+        top_k: Number of candidates to select
+        
+    Returns:
+        Selected candidates, best first, each with an added 'score'
+    """
+    if not candidates:
+        return []
+    
+    docs = []
+    for candidate in candidates:
+        result = candidate["result"]
+        title_tokens = _rerank_tokens(result.get("title", ""))
+        # Titles count twice as much as snippets
+        docs.append(title_tokens * 2 + _rerank_tokens(result.get("snippet", "")))
+    
+    # BM25 over the candidate set itself
+    doc_freq = {}
+    for doc in docs:
+        for token in set(doc):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+    avg_length = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    k1, b = 1.2, 0.75
+    topic_terms = set(_rerank_tokens(research_topic))
+    lexical = []
+    for candidate, doc in zip(candidates, docs):
+        terms = topic_terms | set(_rerank_tokens(candidate["query"]))
+        counts = {}
+        for token in doc:
+            counts[token] = counts.get(token, 0) + 1
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            weight = 2.0 if term in topic_terms else 1.0
+            score += weight * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_length))
+        lexical.append(score)
+    max_lexical = max(lexical) or 1.0
+    
+    scored = []
+    for candidate, doc, lexical_score in zip(candidates, docs, lexical):
+        result = candidate["result"]
+        score = (RERANK_WEIGHTS["lexical"] * lexical_score / max_lexical
+                 + RERANK_WEIGHTS["recency"] * _recency_score(result.get("date", ""))
+                 + RERANK_WEIGHTS["rank"] / (1 + candidate["rank"])
+                 + _domain_prior(result.get("link", "")))
+        scored.append((score, set(doc), DomainHealthTracker.domain_of(result.get("link", "")), candidate))
+    
+    # Greedy selection with duplicate and same-domain penalties
+    selected = []
+    selected_tokens = []
+    domain_counts = {}
+    remaining = list(scored)
+    while remaining and len(selected) < top_k:
+        best_index, best_score = 0, None
+        for index, (score, tokens, domain, _) in enumerate(remaining):
+            overlap = 0.0
+            for other in selected_tokens:
+                union = len(tokens | other)
+                if union:
+                    overlap = max(overlap, len(tokens & other) / union)
+            adjusted = score - RERANK_DUPLICATE_PENALTY * overlap - RERANK_SAME_DOMAIN_PENALTY * domain_counts.get(domain, 0)
+            if best_score is None or adjusted > best_score:
+                best_index, best_score = index, adjusted
+        _, tokens, domain, candidate = remaining.pop(best_index)
+        selected.append(dict(candidate, score=round(best_score, 3)))
+        selected_tokens.append(tokens)
+        domain_counts[domain] = domain_counts.get(domain, 0) + 1
+    return selected
+
+# --- Research Execution Function ---
+def extract_date_from_content(content: str) -> Optional[str]:
     """
-    Generate diverse search queries to explore the research topic using Gemini.
+    Tries to detect a publication date pattern in scraped content.
     
     Args:
-        research_topic: The topic to research
-        num_queries: Number of search queries to generate
+        content: Scraped page text
         
     Returns:
-        List of search query strings
+        The first date-like string found, or None
     """
-    print(f"\n[SearchPlanner] Generating {num_queries} search queries for: '{research_topic}'")
+    # Looking for common date patterns in the content
+    # YYYY-MM-DD format
+    date_pattern1 = re.compile(r'\b(20\d{2})[-/](0[1-9]|1[0-2])[-/](0[1-9]|[12][0-9]|3[01])\b')
+    # Month DD, YYYY format
+    date_pattern2 = re.compile(r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(20\d{2})\b')
+    # DD Month YYYY format
+    date_pattern3 = re.compile(r'\b(\d{1,2})\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+(20\d{2})\b')
     
-    # Get the current year and month for date filtering
-    from datetime import datetime
-    current_year = datetime.now().year
-    last_year = current_year - 1
+    date_match = date_pattern1.search(content) or date_pattern2.search(content) or date_pattern3.search(content)
+    if date_match:
+        return date_match.group(0)
+    return None
+
+def _store_scrape_result(store: SourceStore, record: SourceRecord, date_from_search: str,
+                         scraped_result: Dict[str, str], summarizer: Optional[SourceSummarizer]) -> None:
+    """Records a scrape result with the most reliable publication date and hands it to the summarizer."""
+    content = scraped_result.get("content", "")
+    error = scraped_result.get("error", "")
     
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-pro",
-        generation_config=genai.GenerationConfig(
-            temperature=0.7,
-            top_p=0.9,
-            max_output_tokens=2048
-        )
-    )
+    # Try to extract date from content if not already available
+    content_date = None
+    if content and (not date_from_search or date_from_search == "Date not available"):
+        content_date = extract_date_from_content(content)
     
-    prompt = f"""Generate exactly {num_queries} diverse and specific search queries to thoroughly research the topic: '{research_topic}'.
-
-These queries should:
-- Cover different aspects of the topic (concepts, applications, developments, challenges, etc.)
-- Be specific and targeted rather than broad/generic
-- PRIORITIZE recent content by using date ranges for recent information
-- Use date filters extensively, especially "{last_year}..{current_year}" or "after:{last_year}"
-- Include "latest", "recent", "new", or "current" in several queries
-- Use advanced search operators where helpful (intitle:, intext:, etc.)
-- For academic topics, include queries targeting recent papers, conferences, or research publications
+    # Determine the most reliable date
+    publication_date = date_from_search
+    if (not publication_date or publication_date == "Date not available") and content_date:
+        publication_date = content_date
+    
+    # Add to collected data
+    store.set_content(record, content, error, publication_date)
+    if summarizer is not None:
+        summarizer.submit(record, content)
 
-Format your response as a Python list of strings. ONLY return the list, no other text:
-["query 1", "query 2", ...]"""
+def _collect_queued_results(store: SourceStore, task_queue: ScrapeTaskQueue, job: str,
+                            queued: Dict[str, str], summarizer: Optional[SourceSummarizer],
+                            deadline: Optional[RunDeadline] = None) -> None:
+    """
+    Waits for workers to finish a job's scrape tasks, storing results as they arrive.
     
-    try:
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Extract list from response
-        try:
-            # Try to extract a proper Python list
-            if response_text.startswith("[") and response_text.endswith("]"):
-                queries = eval(response_text)
-                if isinstance(queries, list) and all(isinstance(q, str) for q in queries):
-                    print(f"[SearchPlanner] Successfully generated {len(queries)} search queries")
-                    return queries[:num_queries]  # Ensure we don't exceed the requested number
-            
-            # If eval fails or doesn't return a list, try parsing manually
-            queries = []
-            for line in response_text.split("\n"):
-                line = line.strip()
-                if line.startswith('"') or line.startswith("'"):
-                    # Extract the query between quotes
-                    query = line.strip('"\'').strip('",\'').strip()
-                    if query:
-                        queries.append(query)
-                elif line.startswith("-") or line.startswith("*"):
-                    # Extract queries from bullet points
-                    query = line[1:].strip()
-                    if query:
-                        queries.append(query)
-            
-            if queries:
-                print(f"[SearchPlanner] Extracted {len(queries)} queries through manual parsing")
-                return queries[:num_queries]
-                
-            # If all else fails, split by commas
-            if "," in response_text:
-                queries = [q.strip() for q in response_text.split(",")]
-                print(f"[SearchPlanner] Extracted {len(queries)} queries by splitting on commas")
-                return queries[:num_queries]
-        except:
-            print(f"[SearchPlanner] Error parsing the generated queries. Using fallback method.")
-        
-        # Fallback: Generate generic queries with current date ranges
-        fallback_queries = [
-            f"{research_topic} definition AND latest developments {current_year}",
-            f"{research_topic} recent research {last_year}..{current_year}",
-            f"{research_topic} new applications case studies after:{last_year}",
-            f"{research_topic} current challenges and limitations {current_year}",
-            f"latest trends {research_topic} {current_year} expert analysis",
-            f"recent breakthroughs in {research_topic} {last_year}..{current_year}",
-            f"newest {research_topic} research papers {current_year}",
-            f"{research_topic} future implications {current_year}"
-        ]
-        print(f"[SearchPlanner] Using {num_queries} fallback queries")
-        return fallback_queries[:num_queries]
-        
-    except Exception as e:
-        print(f"[SearchPlanner] Error generating search queries: {str(e)}")
-        # Fallback queries
-        from datetime import datetime
-        current_year = datetime.now().year
-        last_year = current_year - 1
+    The coordinator also claims and runs the job's tasks itself while waiting,
+    so a run completes even when no workers are attached. With a deadline, the
+    wait ends when the research stage runs out of time and unfinished tasks are dropped.
+    """
+    print(f"[Researcher] Queued {len(queued)} scrape tasks on {task_queue.path} (job {job})")
+    collected = set()
+    while len(collected) < len(queued):
+        if deadline is not None and deadline.stage_expired():
+            deadline.note(f"stopped waiting for {len(queued) - len(collected)} queued scrapes; "
+                          f"search snippets are used for those sources")
+            break
+        finished = task_queue.collect(job, collected)
+        for task in finished:
+            collected.add(task["id"])
+            record = store.get_record(task["url"])
+            if record is None:
+                continue
+            result = task["result"]
+            if task["status"] == "failed" and not result.get("error"):
+                result = {"error": "Scraping Error: task failed in worker mode."}
+            _store_scrape_result(store, record, queued.get(task["url"], ""), result, summarizer)
+        if finished:
+            continue
+        if task_queue.outstanding(job) == 0:
+            break
         
-        fallback_queries = [
-            f"{research_topic} definition AND latest developments {current_year}",
-            f"{research_topic} recent research {last_year}..{current_year}",
-            f"{research_topic} new applications case studies after:{last_year}",
-            f"{research_topic} current challenges and limitations {current_year}",
-            f"latest trends {research_topic} {current_year} expert analysis",
-            f"recent breakthroughs in {research_topic} {last_year}..{current_year}",
-            f"newest {research_topic} research papers {current_year}",
-            f"{research_topic} future implications {current_year}"
-        ]
-        print(f"[SearchPlanner] Using {num_queries} fallback queries due to error")
-        return fallback_queries[:num_queries]
+        task = task_queue.claim(job)
+        if task is not None and deadline is not None and deadline.stage_remaining() < SCRAPE_MIN_TIMEOUT:
+            # Too close to the deadline to scrape here; let the lease lapse and keep collecting
+            task = None
+        if task is not None:
+            run_scrape_task(task_queue, task, max_timeout=deadline.stage_remaining() if deadline is not None else None)
+        else:
+            time.sleep(QUEUE_POLL_INTERVAL)
+    
+    print(f"[Researcher] Collected {len(collected)}/{len(queued)} scrape results from the task queue")
+    task_queue.purge(job)
 
-# --- Research Execution Function ---
-def execute_research(queries: List[str], results_per_query: int, site_restriction: Optional[str] = None) -> List[Dict[str, Any]]:
+def execute_research(queries: List[str], results_per_query: int, site_restriction: Optional[Union[str, List[str]]] = None,
+                     summarizer: Optional[SourceSummarizer] = None,
+                     incremental: Optional[IncrementalState] = None,
+                     task_queue: Optional[ScrapeTaskQueue] = None,
+                     research_topic: Optional[str] = None,
+                     top_k: Optional[int] = None,
+                     deadline: Optional[RunDeadline] = None) -> SourceStore:
     """
     Execute the research by running searches and scraping content.
     
     Args:
         queries: List of search queries to run
         results_per_query: Number of results to fetch per query
-        site_restriction: Optional site to restrict searches to
+        site_restriction: Optional site (or list of sites, searched concurrently) to restrict searches to
+        summarizer: Optional summarizer that receives each document as soon as it is scraped
+        incremental: Optional previous-run state; unchanged documents are reused instead of fetched
+        task_queue: Optional shared queue; scraping is then handed to worker processes
+        research_topic: The research topic, used to rerank results when top_k is set
+        top_k: If set, only the top_k results across all queries (after reranking) are scraped
+        deadline: Optional run deadline; searches and scrapes stop when the research stage
+            runs out of time, leaving the remaining sources with their search snippets only
         
     Returns:
-        List of dictionaries with research data
+        SourceStore holding the queries, search results and scraped content
     """
-    research_data = []
+    store = SourceStore()
+    job = uuid.uuid4().hex if task_queue is not None else None
+    if task_queue is not None:
+        task_queue.set_job_settings(job, scrape_settings())
+    queued = {}  # url -> search date, for documents handed to the task queue
     
+    # Search for results for every query first, so candidates can be compared across queries
+    candidates = []
+    seen_urls = set()
     for query_idx, query in enumerate(queries):
+        if deadline is not None and deadline.stage_expired():
+            deadline.note(f"skipped {len(queries) - query_idx} of {len(queries)} search queries")
+            break
         print(f"\n[Researcher] Processing query {query_idx+1}/{len(queries)}: '{query}'")
+        query_id = store.add_query(query)
         
-        # Search for results
-        search_results = google_search(query, num_results=results_per_query, site_search=site_restriction)
+        search_results = search_sites(query, results_per_query, site_restriction,
+                                      deadline=deadline.stage_end if deadline is not None else None)
         
         if not search_results:
             print(f"[Researcher] No search results found for query: '{query}'")
-            research_data.append({
-                "query": query,
-                "search_results": [],
-                "scraped_content": []
-            })
             continue
         
-        # Trying to detect date pattern in the content
-        def extract_date_from_content(content: str) -> Optional[str]:
-            import re
-            
-            # Looking for common date patterns in the content
-            # YYYY-MM-DD format
-            date_pattern1 = re.compile(r'\b(20\d{2})[-/](0[1-9]|1[0-2])[-/](0[1-9]|[12][0-9]|3[01])\b')
-            # Month DD, YYYY format
-            date_pattern2 = re.compile(r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(20\d{2})\b')
-            # DD Month YYYY format
-            date_pattern3 = re.compile(r'\b(\d{1,2})\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+(20\d{2})\b')
-            
-            date_match = date_pattern1.search(content) or date_pattern2.search(content) or date_pattern3.search(content)
-            if date_match:
-                return date_match.group(0)
-            return None
-        
-        # Scraping content from each result
-        scraped_content = []
         for result_idx, result in enumerate(search_results):
             url = result.get("link")
             if not url:
                 continue
-                
-            print(f"[Researcher] Processing search result {result_idx+1}/{len(search_results)}: {url}")
-            
-            # Using the date from the search result if available
-            date_from_search = result.get("date", "")
-            
-            # Attempt to scrape content
-            scraped_result = scrape_web_content(url)
-            content = scraped_result.get("content", "")
-            error = scraped_result.get("error", "")
-            
-            # Try to extract date from content if not already available
-            content_date = None
-            if content and (not date_from_search or date_from_search == "Date not available"):
-                content_date = extract_date_from_content(content)
-            
-            # Determine the most reliable date
-            publication_date = date_from_search
-            if (not publication_date or publication_date == "Date not available") and content_date:
-                publication_date = content_date
-            
-            # Add to collected data
-            scraped_content.append({
-                "title": result.get("title", ""),
-                "url": url,
-                "snippet": result.get("snippet", ""),
-                "content": content,
-                "error": error,
-                "date": publication_date
-            })
-            
-            # Add a short delay to avoid overwhelming servers
-            time.sleep(1)
+            store.add_search_result(query_id, result)
+            if url in seen_urls:
+                print(f"[Researcher] Skipping search result {result_idx+1}/{len(search_results)} (already found by an earlier query): {url}")
+                continue
+            seen_urls.add(url)
+            candidates.append({"query": query, "query_id": query_id, "rank": result_idx, "result": result})
+    
+    if top_k is not None:
+        selected = rerank_candidates(research_topic or " ".join(queries), candidates, top_k)
+        print(f"\n[Researcher] Reranked {len(candidates)} candidates; scraping the top {len(selected)}:")
+        for position, candidate in enumerate(selected, start=1):
+            print(f"[Researcher]   {position}. ({candidate['score']:.2f}) {candidate['result'].get('title', '')} - {candidate['result']['link']}")
+        candidates = selected
+    
+    # Scraping content from each selected result
+    skipped_scrapes = 0
+    for candidate_idx, candidate in enumerate(candidates):
+        result = candidate["result"]
+        url = result["link"]
+        record = store.get_record(url)
         
-        # Add data for this query
-        research_data.append({
-            "query": query,
-            "search_results": search_results,
-            "scraped_content": scraped_content
-        })
+        if deadline is not None and task_queue is None and deadline.stage_remaining() < SCRAPE_MIN_TIMEOUT:
+            # Out of time: keep the search result so its snippet can still be used
+            store.set_content(record, "", "Skipped: research time budget exhausted.", result.get("date", ""))
+            skipped_scrapes += 1
+            continue
+        
+        if incremental is not None:
+            previous = incremental.reuse_document(result)
+            if previous is not None:
+                print(f"[Researcher] Reusing unchanged document {candidate_idx+1}/{len(candidates)}: {url}")
+                store.set_content(record, previous["content"], "", previous.get("date") or result.get("date", ""))
+                if summarizer is not None:
+                    summarizer.submit(record, previous["content"])
+                continue
+        
+        if task_queue is not None:
+            task_queue.enqueue(job, url, candidate["query_id"])
+            queued[url] = result.get("date", "")
+            continue
+        
+        print(f"[Researcher] Processing search result {candidate_idx+1}/{len(candidates)}: {url}")
+        
+        # Attempt to scrape content, using the date from the search result if available
+        scraped_result = scrape_web_content(url, max_timeout=deadline.stage_remaining() if deadline is not None else None)
+        _store_scrape_result(store, record, result.get("date", ""), scraped_result, summarizer)
+        
+        # Add a short delay to avoid overwhelming servers
+        time.sleep(1)
+    
+    if skipped_scrapes:
+        deadline.note(f"skipped scraping {skipped_scrapes} of {len(candidates)} sources; search snippets are used for those")
+    
+    if task_queue is not None and queued:
+        _collect_queued_results(store, task_queue, job, queued, summarizer, deadline)
+    
+    if incremental is not None:
+        print(f"[Researcher] Incremental run: {incremental.stats['documents_reused']} documents reused, "
+              f"{incremental.stats['documents_fetched']} fetched")
+    stats = store.memory_stats()
+    print(f"[Researcher] Collected {stats['records']} unique sources ({stats['unique_bodies']} unique bodies, "
+          f"{stats['spilled_bodies']} spilled to disk)")
+    return store
+
+# --- Citation Resolver ---
+# Builds the References section locally by matching in-text citations against
+# the sources that were actually scraped, instead of asking the model to write one.
+CITATION_MIN_TOKEN_OVERLAP = 0.6     # Share of a citation's words that must appear in a title to match
+_CITATION_STOPWORDS = {"the", "a", "an", "of", "and", "in", "on", "for", "to", "et", "al", "from", "at", "by", "with"}
+# Words that may surround a site name in a citation, e.g. [Nature Journal, 2023] or [The Verge Online, 2024]
+_CITATION_SITE_WORDS = {"the", "journal", "magazine", "news", "online", "blog", "website", "site", "com", "org"}
+
+def _normalize_citation_key(text: str) -> str:
+    """Normalizes a reference or citation for deduplication: lowercase words only, no numbering or markup."""
+    text = re.sub(r'^\s*(?:[-*+]|\d+[.)]|\[\d+\])\s*', '', text)
+    text = re.sub(r'https?://\S+', lambda m: m.group(0).rstrip('/.').lower(), text)
+    return " ".join(re.findall(r'[a-z0-9:/._-]+', text.lower().replace("*", "").replace("_", " ")))
+
+def _citation_tokens(text: str) -> set:
+    return {token for token in re.findall(r'[a-z0-9]+', text.lower()) if token not in _CITATION_STOPWORDS}
+
+class CitationResolver:
+    """
+    Resolves in-text citations to known source records.
+    
+    Recognizes 'Source N' references, bracketed or parenthetical citations such as
+    '[Source Name, 2024]' or '(Source Name, 2024)', and mentions of source domains.
+    
+    Args:
+        sources: Source records, in the order they were numbered in the synthesis context
+    """
+    
+    def __init__(self, sources: List[SourceRecord]):
+        self.sources = list(sources)
+        self._by_title = {}
+        self._by_domain = {}
+        self._by_url = {}
+        for record in self.sources:
+            self._by_title.setdefault(_normalize_citation_key(record.title), record)
+            self._by_url.setdefault(record.url.rstrip('/').lower(), record)
+            domain = DomainHealthTracker.domain_of(record.url)
+            self._by_domain.setdefault(domain, []).append(record)
+    
+    def _match_name(self, name: str, year: Optional[str] = None) -> List[SourceRecord]:
+        """Matches a cited source name against titles and domains."""
+        key = _normalize_citation_key(name)
+        if not key:
+            return []
+        if key in self._by_title:
+            return [self._by_title[key]]
+        
+        # Domain or site-name citations, e.g. [arxiv.org, 2024], [Nature, 2023] or [MIT Technology Review, 2024].
+        # The site label must be the whole name (less words like 'journal') or span several of its words,
+        # so [Computer Science Review, 2023] does not match science.org
+        compact = re.sub(r'[^a-z0-9]', '', key)
+        words = re.findall(r'[a-z0-9]+', key)
+        core = "".join(word for word in words if word not in _CITATION_SITE_WORDS)
+        spans = {"".join(words[i:j]) for i in range(len(words)) for j in range(i + 2, len(words) + 1)}
+        domain_matches = []
+        for domain, records in self._by_domain.items():
+            labels = domain.split(".")
+            site = labels[-2] if len(labels) >= 2 else labels[0]
+            if key == domain or compact == re.sub(r'[^a-z0-9]', '', domain) or (len(site) > 3 and site in spans | {compact, core}):
+                domain_matches.extend(records)
+        if domain_matches:
+            if year:
+                same_year = [record for record in domain_matches if year in (record.date or "")]
+                if same_year:
+                    return same_year
+            return domain_matches
+        
+        # Title citations, possibly shortened
+        tokens = _citation_tokens(name)
+        if not tokens:
+            return []
+        best, best_score = None, 0.0
+        for record in self.sources:
+            title_tokens = _citation_tokens(record.title)
+            if not title_tokens:
+                continue
+            score = len(tokens & title_tokens) / len(tokens)
+            if score > best_score:
+                best, best_score = record, score
+        return [best] if best is not None and best_score >= CITATION_MIN_TOKEN_OVERLAP else []
+    
+    def resolve(self, text: str) -> List[SourceRecord]:
+        """
+        Finds every known source cited in a piece of text.
+        
+        Returns:
+            Cited records in order of first citation, without duplicates
+        """
+        found = []
+        
+        def add(position: int, records: List[SourceRecord]) -> None:
+            for record in records:
+                found.append((position, record))
+        
+        for match in re.finditer(r'\bSources?\s+#?(\d+(?:\s*(?:,|and|&)\s*#?\d+)*)', text, re.IGNORECASE):
+            for number in re.findall(r'\d+', match.group(1)):
+                index = int(number) - 1
+                if 0 <= index < len(self.sources):
+                    add(match.start(), [self.sources[index]])
+        
+        for match in re.finditer(r'\[([^\[\]\n]{2,200})\]|\(([^()\n]{2,200}?),\s*(?:19|20)\d{2}[a-z]?\)', text):
+            if match.group(2) is not None:
+                year_match = re.search(r'(?:19|20)\d{2}', match.group(0))
+                add(match.start(), self._match_name(match.group(2), year_match.group(0) if year_match else None))
+                continue
+            for citation in re.split(r'\s*;\s*', match.group(1)):
+                if re.match(r'^\s*Sources?\s+#?\d', citation, re.IGNORECASE):
+                    continue  # Already handled above
+                year_match = re.search(r'\b((?:19|20)\d{2})[a-z]?\b|\bn\.d\.', citation)
+                name = re.sub(r',?\s*(?:(?:19|20)\d{2}[a-z]?|n\.d\.)\s*$', '', citation).strip(" ,")
+                add(match.start(), self._match_name(name, year_match.group(1) if year_match and year_match.group(1) else None))
+        
+        lowered = text.lower()
+        for url, record in self._by_url.items():
+            position = lowered.find(url)
+            if position >= 0:
+                add(position, [record])
+        for domain, records in self._by_domain.items():
+            if "." not in domain:
+                continue
+            match = re.search(r'(?<![\w.])' + re.escape(domain) + r'(?![\w-])', lowered)
+            if match and len(records) == 1:
+                add(match.start(), records)
+        
+        ordered = []
+        seen = set()
+        for _, record in sorted(found, key=lambda item: item[0]):
+            if record.url not in seen:
+                seen.add(record.url)
+                ordered.append(record)
+        return ordered
     
-    return research_data
+    @staticmethod
+    def format_reference(record: SourceRecord) -> str:
+        """Formats a source record as a reference list entry."""
+        year = _citation_year(record.date)
+        title = record.title or record.url
+        return f"{title}. *{DomainHealthTracker.domain_of(record.url)}*. ({year}). {record.url}"
+    
+    def build_references(self, report_text: str, extra_references: Optional[List[str]] = None) -> str:
+        """
+        Builds the References section for a report.
+        
+        Args:
+            report_text: Report body whose in-text citations are resolved
+            extra_references: Reference lines the model wrote inside sections; those that
+                resolve to a known source are merged with it, the rest are kept as written
+                
+        Returns:
+            Markdown References section
+        """
+        cited = self.resolve(report_text)
+        resolved_count = len(cited)
+        if not cited:
+            # Nothing could be resolved; list the evidence the report was written from
+            cited = list(self.sources)
+        
+        entries = {}
+        for record in cited:
+            entries.setdefault(record.url, self.format_reference(record))
+        for ref in extra_references or []:
+            records = self.resolve(ref)
+            if records:
+                for record in records:
+                    entries.setdefault(record.url, self.format_reference(record))
+            else:
+                key = _normalize_citation_key(ref)
+                if key:
+                    entries.setdefault(key, re.sub(r'^\s*(?:[-*+]|\d+[.)]|\[\d+\])\s*', '', ref).strip())
+        
+        lines = ["## References", ""]
+        for number, entry in enumerate(entries.values(), start=1):
+            lines.append(f"{number}. {entry}")
+        print(f"[CitationResolver] Built {len(entries)} references ({resolved_count} citations resolved to scraped sources)")
+        return "\n\n" + "\n".join(lines) + "\n"
 
 # --- Synthesize Research Report with Gemini ---
-def synthesize_report(research_topic: str, research_data: List[Dict[str, Any]], depth: int) -> str:
+FALLBACK_EXCERPT_CHARS = 600   # Characters of each source quoted in a report built without the model
+
+def build_extractive_report(research_topic: str, store: SourceStore, current_date: str,
+                            summaries: Optional[Dict[str, str]] = None) -> str:
+    """
+    Builds a report locally from the collected sources, without calling a model.
+    
+    Used when a deadline leaves no time for synthesis (or synthesis fails under one),
+    so a run always ends with the evidence it gathered.
+    """
+    sources = store.numbered_sources(snippet_fallback=True)
+    lines = [f"**Research Report: {research_topic}**", "",
+             f"**Publication Date:** {current_date}", "",
+             "## Key Sources", "",
+             "This report lists the collected sources directly because there was not enough time to synthesize them.", ""]
+    for number, record in enumerate(sources, start=1):
+        excerpt = (summaries or {}).get(record.url) or store.get_content(record) or record.snippet
+        excerpt = " ".join(excerpt.split())
+        if len(excerpt) > FALLBACK_EXCERPT_CHARS:
+            excerpt = excerpt[:FALLBACK_EXCERPT_CHARS].rsplit(" ", 1)[0] + "..."
+        lines.append(f"### Source {number}: {record.title or record.url}")
+        lines.append(f"{record.url} ({record.date or 'Date not available'})")
+        lines.append("")
+        lines.append(excerpt or "No content was collected for this source.")
+        lines.append("")
+    lines.append("## References")
+    lines.append("")
+    for number, record in enumerate(sources, start=1):
+        lines.append(f"{number}. {CitationResolver.format_reference(record)}")
+    print(f"[Synthesizer] Built extractive report from {len(sources)} sources without the model")
+    return "\n".join(lines) + "\n"
+
+def synthesize_report(research_topic: str, research_data: Union[SourceStore, List[Dict[str, Any]]], depth: int,
+                      summaries: Optional[Dict[str, str]] = None,
+                      incremental: Optional[IncrementalState] = None,
+                      deadline: Optional[RunDeadline] = None) -> str:
     """
     Synthesize a comprehensive research report using Gemini by breaking it into manageable chunks.
     
     Args:
         research_topic: The research topic
-        research_data: Collected research data
+        research_data: Collected research data (a SourceStore or the legacy list of query dicts)
         depth: Research depth level (1-3)
+        summaries: Optional URL -> fact sheet mapping from SourceSummarizer, used instead of raw page text
+        incremental: Optional previous-run state; report parts whose evidence is unchanged are reused
+        deadline: Optional run deadline; when time is short the report gets fewer and shorter
+            sections, the single-prompt path, or, as a last resort, an extractive report built locally
         
     Returns:
         Formatted research report
@@ -464,32 +3161,71 @@ def synthesize_report(research_topic: str, research_data: List[Dict[str, Any]],
     current_date = datetime.now().strftime("%B %d, %Y")
     
     # Create context for the model
-    context = f"# Research Topic: {research_topic}\n\n"
-    
-    # Add collected data
-    source_count = 0
-    for query_data in research_data:
-        query = query_data.get("query", "")
-        context += f"## Search Query: {query}\n\n"
-        
-        for content_item in query_data.get("scraped_content", []):
-            title = content_item.get("title", "No title")
-            url = content_item.get("url", "")
-            content = content_item.get("content", "")
-            date = content_item.get("date", "Date not available")  # Include date when available
-            error = content_item.get("error", "")
-            
-            if content:  
-                source_count += 1
-                context += f"### Source {source_count}: {title}\n"
-                context += f"URL: {url}\n"
-                context += f"Date: {date}\n\n"
-                # Limit content length to avoid exceeding model context
-                max_content_chars = 10000
-                if len(content) > max_content_chars:
-                    context += content[:max_content_chars] + "...\n\n"
-                else:
-                    context += content + "\n\n"
+    if not isinstance(research_data, SourceStore):
+        research_data = SourceStore.from_research_data(research_data)
+    # Under a deadline, sources that could not be scraped in time still contribute their snippets
+    snippet_fallback = deadline is not None
+    if summaries:
+        # Split the prompt budget evenly so every summarized source fits
+        summarized_sources = sum(1 for record in research_data.records() if record.url in summaries)
+        per_source_chars = max(SUMMARY_MIN_CHARS_PER_SOURCE, SUMMARY_CONTEXT_BUDGET // max(1, summarized_sources))
+        context = research_data.build_context(research_topic, max_content_chars=per_source_chars, summaries=summaries,
+                                              snippet_fallback=snippet_fallback)
+        print(f"[Synthesizer] Using fact sheets for {summarized_sources} sources ({len(context)} characters of context)")
+    else:
+        context = research_data.build_context(research_topic, max_content_chars=10000, snippet_fallback=snippet_fallback)
+    
+    def limit_context(max_chars: int) -> str:
+        """Slices raw-text context to fit a prompt. Fact sheets are already budgeted and never sliced."""
+        return context if summaries else context[:max_chars]
+    
+    # For incremental runs: the number and content version of every source in the context,
+    # so a stored part can be reused when the sources it cites are unchanged
+    numbered_sources = research_data.numbered_sources(snippet_fallback)
+    source_versions = {}
+    for number, record in enumerate(numbered_sources, start=1):
+        seen_text = summaries.get(record.url) if summaries and record.url in summaries else None
+        if seen_text is not None:
+            version = hashlib.sha1(seen_text.encode("utf-8")).hexdigest()
+        else:
+            version = record.content_key or hashlib.sha1(record.snippet.encode("utf-8")).hexdigest()
+        source_versions[record.url] = [number, version]
+    part_resolver = CitationResolver(numbered_sources) if incremental is not None else None
+    
+    def generate_part(stage: str, prompt: str, part: Any, evidence: str) -> str:
+        """
+        Generates one report part, reusing the previous run's text when its evidence is unchanged.
+        
+        Args:
+            stage: Router stage
+            prompt: Full prompt
+            part: Identifies the part within the report (e.g. the section title)
+            evidence: The research data embedded in the prompt
+        """
+        call_deadline = deadline.stage_end if deadline is not None else None
+        if incremental is None:
+            return model_router.generate(stage, prompt, generation_config, deadline=call_deadline).strip()
+        # The key covers the prompt without its data (or the date) and the model answering it;
+        # the data itself is checked through the sources the stored part cites
+        template = prompt.replace(evidence, "").replace(current_date, "") if evidence else prompt.replace(current_date, "")
+        key = IncrementalState.evidence_key(stage, depth, part, model_router.primary_model(stage),
+                                            hashlib.sha1(template.encode("utf-8")).hexdigest())
+        evidence_hash = hashlib.sha1(evidence.encode("utf-8")).hexdigest()
+        text = incremental.get_section(key, current_date, source_versions, evidence_hash)
+        if text is not None:
+            print(f"[Synthesizer] Reusing unchanged {stage} part ({part}) from previous run")
+            return text
+        text = model_router.generate(stage, prompt, generation_config, deadline=call_deadline).strip()
+        cited = {record.url: source_versions[record.url] for record in part_resolver.resolve(text)
+                 if record.url in source_versions}
+        incremental.put_section(key, text, current_date, cited, evidence_hash)
+        return text
+    
+    def time_for(*stages: str) -> bool:
+        """Whether the expected duration of calls in the given stages fits in the synthesis budget."""
+        if deadline is None:
+            return True
+        return sum(model_router.estimate_latency(stage) for stage in stages) <= deadline.stage_remaining()
     
     # Determine report expectations based on depth
     if depth == 1:
@@ -508,18 +3244,18 @@ def synthesize_report(research_topic: str, research_data: List[Dict[str, Any]],
         min_words = 10000  # Approximately 20 pages
         sections = 12  # Many sections for depth 3
     
-    # Initialize Gemini model with appropriate settings
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-pro",
-        generation_config=genai.GenerationConfig(
-            temperature=0.2,  # Lower temperature for more factual output
-            top_p=0.95,
-            max_output_tokens=100000  # Set to maximum for comprehensive reports
-        )
-    )
+    # Generation settings shared by all synthesis stages
+    generation_config = {
+        "temperature": 0.2,  # Lower temperature for more factual output
+        "top_p": 0.95,
+        "max_output_tokens": 100000  # Set to maximum for comprehensive reports
+    }
+    
+    if depth >= 2 and not time_for("outline", "intro", "sections", "conclusion"):
+        deadline.note(f"not enough time for the sectional depth-{depth} report")
     
     # For larger reports (depth 2-3), break it down into sections
-    if depth >= 2:
+    elif depth >= 2:
         print(f"[Synthesizer] Breaking down depth {depth} report into {sections} sections")
         
         # First, generate an outline with standardized structure
@@ -549,11 +3285,15 @@ FORMAT YOUR RESPONSE AS:
 ... and so on until the References section
 
 DO NOT include explanatory text, just the outline structure.
+"""
+        if summaries:
+            outline_prompt += f"""
+Base the main section titles on these research findings:
+{context}
 """
         
         try:
-            outline_response = model.generate_content(outline_prompt)
-            outline = outline_response.text.strip()
+            outline = generate_part("outline", outline_prompt, "outline", context if summaries else "")
             print(f"[Synthesizer] Successfully generated report outline with standardized structure")
             
             # Extract main sections from the outline
@@ -586,13 +3326,12 @@ DO NOT include explanatory text, just the outline structure.
 Today's date is {current_date}. Include this date in the publication date.
 
 Research data:
-{context[:15000]}  # Limit context to avoid token limit
+{limit_context(15000)}
 
 FORMAT: Professional, academic style with appropriate headings. DO NOT include citations in the executive summary.
 """
             
-            intro_response = model.generate_content(intro_prompt)
-            report_parts = [intro_response.text.strip()]
+            report_parts = [generate_part("intro", intro_prompt, "introduction", limit_context(15000))]
             
             # Track all references to consolidate at the end
             all_references = []
@@ -602,18 +3341,35 @@ FORMAT: Professional, academic style with appropriate headings. DO NOT include c
             content_sections = [section for section in main_sections if section not in 
                              ["Executive Summary", "Introduction", "Conclusion", "References", 
                               "Challenges and Limitations", "Future Directions and Research Opportunities"]]
+            section_words = 2000 if depth == 2 else 3000
+            
+            if deadline is not None:
+                # Keep time for the conclusion, then fit as many content sections as the budget allows
+                section_estimate = model_router.estimate_latency("sections")
+                available = deadline.stage_remaining() - model_router.estimate_latency("conclusion")
+                fitting = max(1, int(available // section_estimate))
+                if fitting < len(content_sections) + 2:
+                    section_words = 1000
+                    deadline.note(f"shortened sections to about {section_words} words")
+                if fitting < len(content_sections):
+                    deadline.note(f"dropped {len(content_sections) - fitting} of {len(content_sections)} content sections: "
+                                  + ", ".join(content_sections[fitting:]))
+                    content_sections = content_sections[:fitting]
             
             # First generate all content sections
             for i, section_title in enumerate(content_sections):
                 section_num = i + 3  # Starting from section 3 (after exec summary and intro)
+                if not time_for("sections", "conclusion"):
+                    deadline.note(f"dropped {len(content_sections) - i} remaining content sections: " + ", ".join(content_sections[i:]))
+                    break
                 section_prompt = f"""Write section {section_num}: "{section_title}" for a depth level {depth} research report on '{research_topic}'.
 
-This section should be approximately {2000 if depth == 2 else 3000} words and dive deep into this aspect of the topic.
+This section should be approximately {section_words} words and dive deep into this aspect of the topic.
 Include relevant subsections, include in-text citations but DO NOT include a references list at the end of this section.
 Ensure you incorporate the most recent developments (current date: {current_date}).
 
 Research data related to this section:
-{context[:20000]}  # Limit context to avoid token limit
+{limit_context(20000)}
 
 FORMAT: Professional academic style with clear subsection headings (e.g., "{section_num}.1", "{section_num}.2").
 Cite sources in-text as [Source Name, Year] or similar academic format.
@@ -621,8 +3377,7 @@ DO NOT include a references/sources list at the end of this section.
 """
                 
                 print(f"[Synthesizer] Generating section {section_num}: {section_title}")
-                section_response = model.generate_content(section_prompt)
-                section_content = section_response.text.strip()
+                section_content = generate_part("sections", section_prompt, f"{section_num}. {section_title}", limit_context(20000))
                 
                 # Extract references from the section to consolidate later
                 references_match = re.search(r'(?:References|Sources):\s*([\s\S]+?)(?=\n\n|$)', section_content, re.IGNORECASE)
@@ -649,15 +3404,18 @@ Length: Approximately 1200-1800 words
 Include relevant subsections and in-text citations.
 
 Research data:
-{context[:15000]}  # Limit context to avoid token limit
+{limit_context(15000)}
 
 FORMAT: Professional academic style with appropriate subsections.
 Include in-text citations but DO NOT include a references list at the end of this section.
 """
             
-            print(f"[Synthesizer] Generating Challenges and Limitations section")
-            challenges_response = model.generate_content(challenges_prompt)
-            challenges_content = challenges_response.text.strip()
+            if time_for("sections", "conclusion"):
+                print(f"[Synthesizer] Generating Challenges and Limitations section")
+                challenges_content = generate_part("sections", challenges_prompt, "Challenges and Limitations", limit_context(15000))
+            else:
+                deadline.note("dropped the Challenges and Limitations section")
+                challenges_content = ""
             
             # Extract any references from this section
             references_match = re.search(r'(?:References|Sources):\s*([\s\S]+?)(?=\n\n|$)', challenges_content, re.IGNORECASE)
@@ -667,7 +3425,8 @@ Include in-text citations but DO NOT include a references list at the end of thi
                 # Remove references section from the content
                 challenges_content = re.sub(r'(?:References|Sources):\s*[\s\S]+?(?=\n\n|$)', '', challenges_content, flags=re.IGNORECASE)
             
-            report_parts.append(challenges_content)
+            if challenges_content:
+                report_parts.append(challenges_content)
             
             # Generate Future Directions
             future_prompt = f"""Write the "Future Directions and Research Opportunities" section for a depth level {depth} research report on '{research_topic}'.
@@ -682,15 +3441,18 @@ Length: Approximately 1200-1800 words
 Include relevant subsections and in-text citations.
 
 Research data:
-{context[:15000]}  # Limit context to avoid token limit
+{limit_context(15000)}
 
 FORMAT: Professional academic style with appropriate subsections.
 Include in-text citations but DO NOT include a references list at the end of this section.
 """
             
-            print(f"[Synthesizer] Generating Future Directions section")
-            future_response = model.generate_content(future_prompt)
-            future_content = future_response.text.strip()
+            if time_for("sections", "conclusion"):
+                print(f"[Synthesizer] Generating Future Directions section")
+                future_content = generate_part("sections", future_prompt, "Future Directions and Research Opportunities", limit_context(15000))
+            else:
+                deadline.note("dropped the Future Directions and Research Opportunities section")
+                future_content = ""
             
             # Extract any references from this section
             references_match = re.search(r'(?:References|Sources):\s*([\s\S]+?)(?=\n\n|$)', future_content, re.IGNORECASE)
@@ -700,7 +3462,8 @@ Include in-text citations but DO NOT include a references list at the end of thi
                 # Remove references section from the content
                 future_content = re.sub(r'(?:References|Sources):\s*[\s\S]+?(?=\n\n|$)', '', future_content, flags=re.IGNORECASE)
             
-            report_parts.append(future_content)
+            if future_content:
+                report_parts.append(future_content)
             
             # Generate conclusion
             conclusion_prompt = f"""Write the conclusion section for a depth level {depth} research report on '{research_topic}'.
@@ -717,14 +3480,17 @@ DO NOT include a separate future directions section, as this has already been co
 DO NOT include references at the end of this section.
 
 Research data:
-{context[:10000]}  # Limit context to avoid token limit
+{limit_context(10000)}
 
 FORMAT: Professional academic style.
 """
             
-            print(f"[Synthesizer] Generating conclusion section")
-            conclusion_response = model.generate_content(conclusion_prompt)
-            conclusion_content = conclusion_response.text.strip()
+            if time_for("conclusion"):
+                print(f"[Synthesizer] Generating conclusion section")
+                conclusion_content = generate_part("conclusion", conclusion_prompt, "conclusion", limit_context(10000))
+            else:
+                deadline.note("dropped the Conclusion section")
+                conclusion_content = ""
             
             # Extract any references from the conclusion
             references_match = re.search(r'(?:References|Sources):\s*([\s\S]+?)(?=\n\n|$)', conclusion_content, re.IGNORECASE)
@@ -734,38 +3500,12 @@ FORMAT: Professional academic style.
                 # Remove references from the conclusion
                 conclusion_content = re.sub(r'(?:References|Sources):\s*[\s\S]+?(?=\n\n|$)', '', conclusion_content, flags=re.IGNORECASE)
             
-            report_parts.append(conclusion_content)
+            if conclusion_content:
+                report_parts.append(conclusion_content)
             
-            # Deduplicate and format references
-            unique_references = []
-            for ref in all_references:
-                if ref and ref not in unique_references:
-                    unique_references.append(ref)
-            
-            # Generate consolidated references section
-            if unique_references:
-                references_section = "\n\n## References\n\n"
-                for ref in unique_references:
-                    references_section += f"{ref}\n\n"
-                report_parts.append(references_section)
-            else:
-                # Generate references if none were extracted
-                references_prompt = f"""Create a comprehensive references list for a research report on '{research_topic}'.
-
-Based on the sources mentioned in the report, compile a properly formatted academic references list.
-Include all sources that would have been cited in a report covering:
-1. Current state of the art in {research_topic}
-2. Key technologies and methodologies
-3. Challenges and limitations
-4. Future directions
-
-FORMAT: Academic style references list with proper formatting for different types of sources (journal articles, books, websites, etc.)
-Include approximately 15-20 high-quality, relevant references from reputable sources.
-"""
-                
-                print(f"[Synthesizer] Generating references section")
-                references_response = model.generate_content(references_prompt)
-                report_parts.append(references_response.text.strip())
+            # Build the consolidated references section from the scraped sources
+            resolver = CitationResolver(numbered_sources)
+            report_parts.append(resolver.build_references("\n\n".join(report_parts), all_references))
             
             # Combine all parts
             full_report = "\n\n".join(report_parts)
@@ -824,9 +3564,17 @@ Include approximately 15-20 high-quality, relevant references from reputable sou
         except Exception as e:
             print(f"[Synthesizer] Error in sectional report generation: {str(e)}")
             print(f"[Synthesizer] Falling back to standard report generation")
+            if deadline is not None:
+                deadline.note(f"sectional report failed ({type(e).__name__})")
             # Continue with standard approach below
     
     # Standard approach for depth 1 or if sectional approach fails
+    if not time_for("report"):
+        deadline.note("not enough time for a single-prompt report; built an extractive report from the sources")
+        return build_extractive_report(research_topic, research_data, current_date, summaries)
+    if deadline is not None and depth >= 2:
+        deadline.note("wrote a single-prompt report instead")
+    
     prompt = f"""Based on the research data provided, create a comprehensive, well-structured research report on '{research_topic}'.
 
 IMPORTANT: Today's date is {current_date}. Use this as the publication date of the report.
@@ -862,8 +3610,7 @@ Here is the research data to synthesize:
 
     try:
         print(f"[Synthesizer] Generating report with Gemini...")
-        response = model.generate_content(prompt)
-        report = response.text
+        report = generate_part("report", prompt, "report", context)
         
         # Ensure the report includes the current date
         if current_date not in report[:1000]:  # Check first 1000 chars
@@ -922,10 +3669,182 @@ Here is the research data to synthesize:
         return report
     except Exception as e:
         print(f"[Synthesizer] Error generating research report: {str(e)}")
+        if deadline is not None:
+            deadline.note(f"model synthesis did not finish ({type(e).__name__}); built an extractive report from the sources")
+            return build_extractive_report(research_topic, research_data, current_date, summaries)
         return f"Error generating research report: {str(e)}\n\nPlease try again with a smaller research scope or lower depth level."
 
+# --- Snippet-Only Fast Mode ---
+# For a quick brief, the report is written from search titles, snippets and
+# dates alone: searches run concurrently, nothing is scraped, and the compact
+# prompt goes to the 'brief' route's fast model. The top few sources can be
+# scraped in the background for a fuller follow-up report.
+FAST_SEARCH_WORKERS = 5
+FAST_UPGRADE_WORKERS = 4
+
+def search_snippets(queries: List[str], results_per_query: int,
+                    site_restriction: Optional[Union[str, List[str]]] = None,
+                    deadline: Optional[RunDeadline] = None) -> SourceStore:
+    """
+    Runs all searches concurrently and keeps only the search results, without scraping.
+    
+    Args:
+        queries: List of search queries to run
+        results_per_query: Number of results to fetch per query
+        site_restriction: Optional site (or list of sites, searched concurrently) to restrict searches to
+        deadline: Optional run deadline; searches still running when the research stage ends are dropped
+        
+    Returns:
+        SourceStore holding the queries and their search results
+    """
+    store = SourceStore()
+    search_deadline = deadline.stage_end if deadline is not None else None
+    print(f"\n[Researcher] Running {len(queries)} searches concurrently (snippets only)")
+    with ThreadPoolExecutor(max_workers=FAST_SEARCH_WORKERS) as executor:
+        futures = [executor.submit(search_sites, query, results_per_query, site_restriction, search_deadline)
+                   for query in queries]
+        for query, future in zip(queries, futures):
+            query_id = store.add_query(query)
+            try:
+                search_results = future.result()
+            except Exception as e:
+                print(f"[Researcher] Search failed for query '{query}': {e}")
+                continue
+            for result in search_results:
+                if result.get("link"):
+                    store.add_search_result(query_id, result)
+    print(f"[Researcher] Collected {len(store)} unique search results")
+    return store
+
+def synthesize_brief(research_topic: str, store: SourceStore, deadline: Optional[RunDeadline] = None) -> str:
+    """
+    Writes a short report from search snippets with one compact prompt.
+    
+    Args:
+        research_topic: The research topic
+        store: SourceStore of search results (scraped content, if any, is not used)
+        deadline: Optional run deadline; an extractive report is returned if the model cannot answer in time
+        
+    Returns:
+        Formatted brief with a References section
+    """
+    from datetime import datetime
+    current_date = datetime.now().strftime("%B %d, %Y")
+    sources = store.numbered_sources(snippet_fallback=True)
+    print(f"\n[Synthesizer] Writing brief on '{research_topic}' from {len(sources)} search snippets")
+    
+    lines = []
+    for number, record in enumerate(sources, start=1):
+        lines.append(f"[Source {number}] {record.title or record.url} ({DomainHealthTracker.domain_of(record.url)}, "
+                     f"{record.date or 'n.d.'}): {' '.join(record.snippet.split())}")
+    prompt = f"""Write a concise research brief (400-600 words) on '{research_topic}' using only the search results below.
+Today's date is {current_date}.
+
+Structure: a title, "Key Findings" as 4-8 bullet points, then a short "Overview" paragraph and "Open Questions".
+Cite sources in-text as [Source N]. Do not invent facts beyond the snippets and do not write a references list.
+
+Search results:
+{chr(10).join(lines)}"""
+    
+    generation_config = {
+        "temperature": 0.2,
+        "top_p": 0.95,
+        "max_output_tokens": 2048
+    }
+    try:
+        brief = model_router.generate("brief", prompt, generation_config,
+                                      deadline=deadline.stage_end if deadline is not None else None).strip()
+    except Exception as e:
+        print(f"[Synthesizer] Error generating brief: {str(e)}")
+        if deadline is not None:
+            deadline.note(f"model brief did not finish ({type(e).__name__}); built an extractive report from the snippets")
+        return build_extractive_report(research_topic, store, current_date)
+    
+    if current_date not in brief[:1000]:
+        brief = f"**Research Brief: {research_topic}**\n\n**Publication Date:** {current_date}\n\n" + brief
+    brief += CitationResolver(sources).build_references(brief)
+    print(f"[Synthesizer] Successfully generated brief (~{len(brief.split())} words)")
+    return brief
+
+class SourceUpgrade:
+    """
+    Scrapes the best few sources of a snippet-only run in the background.
+    
+    Args:
+        research_topic: The research topic, used to pick the sources
+        store: SourceStore of search results; scraped content is written into it
+        top_n: Number of sources to scrape
+        deadline: Optional run deadline; scrapes and the full report must finish before it
+    """
+    
+    def __init__(self, research_topic: str, store: SourceStore, top_n: int, deadline: Optional[RunDeadline] = None):
+        self.research_topic = research_topic
+        self.store = store
+        self.deadline = deadline
+        # A URL found by several queries is one candidate, kept at its earliest query's rank
+        candidates = []
+        seen_urls = set()
+        for query, records in store.queries():
+            for rank, record in enumerate(records):
+                if record.url in seen_urls:
+                    continue
+                seen_urls.add(record.url)
+                candidates.append({"query": query, "rank": rank, "result": record.to_search_result(), "record": record})
+        selected = rerank_candidates(research_topic, candidates, top_n)
+        self._executor = ThreadPoolExecutor(max_workers=FAST_UPGRADE_WORKERS)
+        self._futures = [(candidate["record"], self._executor.submit(self._scrape, candidate["record"].url))
+                         for candidate in selected]
+        print(f"[SourceUpgrade] Scraping the top {len(self._futures)} sources in the background")
+    
+    def _remaining(self) -> Optional[float]:
+        """Seconds left before the run's deadline (less its reserve), or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return self.deadline.end - self.deadline.reserve - time.time()
+    
+    def _scrape(self, url: str) -> Dict[str, str]:
+        remaining = self._remaining()
+        if remaining is not None and remaining < SCRAPE_MIN_TIMEOUT:
+            return {"error": "Skipped: not enough time left before the deadline."}
+        return scrape_web_content(url, max_timeout=remaining)
+    
+    def report(self, depth: int = 1) -> Optional[str]:
+        """
+        Waits for the scrapes and writes a report from the sources that were scraped.
+        
+        Returns:
+            The report, or None if no source could be scraped
+        """
+        for record, future in self._futures:
+            remaining = self._remaining()
+            try:
+                scraped_result = future.result(timeout=max(0.0, remaining) if remaining is not None else None)
+            except FutureTimeoutError:
+                scraped_result = {"error": "Skipped: scrape did not finish before the deadline."}
+            except Exception as e:
+                scraped_result = {"error": f"Scraping Error: {e}"}
+            _store_scrape_result(self.store, record, record.date, scraped_result, None)
+        self.close()
+        if domain_health is not None:
+            domain_health.save()
+        scraped = sum(1 for record, _ in self._futures if record.content_key is not None)
+        print(f"[SourceUpgrade] Scraped {scraped}/{len(self._futures)} sources")
+        if not scraped:
+            return None
+        if self.deadline is not None:
+            self.deadline.begin_stage("upgrade", 1.0)
+        return synthesize_report(self.research_topic, self.store, depth, deadline=self.deadline)
+    
+    def close(self) -> None:
+        """Shuts down the worker pool, dropping scrapes that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 # --- Main Execution Logic ---
 def main():
+    # `gemini_research.py worker ...` runs a scrape worker for distributed runs
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        return worker_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(description="Deep Research Tool using Google Gemini")
     
     # Required arguments
@@ -937,13 +3856,65 @@ def main():
     parser.add_argument("-q", "--queries", type=int, default=None, 
                         help="Number of search queries to generate (default: based on depth)")
     parser.add_argument("-r", "--results", type=int, default=None, 
-                        help="Number of results per query (default: based on depth)")
+                        help="Number of results per query, up to 100 (default: based on depth)")
     parser.add_argument("-s", "--site", default=None, 
-                        help="Restrict search to a specific site (e.g., 'nytimes.com')")
+                        help="Restrict search to a site (e.g., 'nytimes.com'), a comma-separated list of sites, "
+                             "or a file with one site per line")
     parser.add_argument("--verbose", type=int, default=1, choices=[0, 1, 2], 
                         help="Verbosity level: 0 (minimal), 1 (regular), 2 (debug)")
+    parser.add_argument("--per-host-connections", type=int, default=HTTP_PER_HOST_CONNECTIONS,
+                        help=f"Maximum simultaneous connections per host when scraping (default: {HTTP_PER_HOST_CONNECTIONS})")
+    parser.add_argument("--connect-retries", type=int, default=HTTP_CONNECT_RETRIES,
+                        help=f"Retries for scraper requests that fail to connect (default: {HTTP_CONNECT_RETRIES})")
+    parser.add_argument("--route", action="append", default=None, metavar="STAGE=MODEL[,FALLBACK...]",
+                        help=f"Override the model chain for a stage ({', '.join(DEFAULT_MODEL_ROUTES)}). May be repeated.")
+    parser.add_argument("--model-backend", choices=["gemini", "fake"], default="gemini",
+                        help="Model backend: 'gemini' (default) or 'fake' for offline testing without API calls")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the previous run on this topic: only fetch new/changed documents and rewrite changed sections")
+    parser.add_argument("--queue", default=None,
+                        help="Hand scraping to `gemini_research.py worker` processes through this shared SQLite queue")
+    parser.add_argument("--save-corpus", default=None, metavar="PATH",
+                        help="Save the collected queries, search results and documents (.jsonl, .jsonl.gz or .jsonl.zst)")
+    parser.add_argument("--from-corpus", default=None, metavar="PATH",
+                        help="Skip searching and scraping and synthesize from a corpus saved with --save-corpus")
+    parser.add_argument("--rerank", action="store_true",
+                        help="Rerank search results across all queries and scrape only the top K (see --top-k)")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help=f"Number of reranked results to scrape (implies --rerank; default by depth: {RERANK_TOP_K})")
+    parser.add_argument("--summarize", action="store_true",
+                        help="Summarize each source with the 'summary' route's fast model before synthesis")
+    parser.add_argument("--no-domain-health", action="store_true",
+                        help="Disable per-domain adaptive timeouts and circuit breakers")
+    parser.add_argument("--no-hedge", action="store_true",
+                        help="Disable hedged (duplicate) requests to slow hosts")
+    parser.add_argument("--http2", action="store_true",
+                        help="Use HTTP/2 for scraping (requires the optional 'httpx[http2]' package)")
+    parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                        help="Finish the run within this many seconds, cutting scrapes and report sections as needed")
+    parser.add_argument("--fast", action="store_true",
+                        help="Write a short brief from search snippets only, without scraping (uses the 'brief' route)")
+    parser.add_argument("--fast-upgrade", type=int, default=0, metavar="N",
+                        help="With --fast, also scrape the top N sources in the background and save a fuller report")
+    parser.add_argument("--llm-cache", action="store_true",
+                        help="Answer repeated identical model requests from a persistent response cache")
+    parser.add_argument("--llm-cache-ttl", type=float, default=LLM_CACHE_TTL, metavar="SECONDS",
+                        help=f"Ignore cached model responses older than this (default: {LLM_CACHE_TTL})")
+    parser.add_argument("--llm-cache-max-mb", type=float, default=LLM_CACHE_MAX_BYTES / (1024 * 1024),
+                        help=f"Size limit of the model response cache; least recently used entries are evicted "
+                             f"(default: {LLM_CACHE_MAX_BYTES // (1024 * 1024)})")
     
     args = parser.parse_args()
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be a positive number of seconds")
+    if args.llm_cache_ttl <= 0:
+        parser.error("--llm-cache-ttl must be a positive number of seconds")
+    deadline = RunDeadline(args.deadline) if args.deadline is not None else None
+    sites = parse_site_list(args.site)
+    if args.fast and (args.queue or args.incremental or args.summarize or args.rerank or args.top_k is not None):
+        parser.error("--fast cannot be combined with --queue, --incremental, --summarize, --rerank or --top-k")
+    if args.fast_upgrade and not args.fast:
+        parser.error("--fast-upgrade requires --fast")
     
     # Set depth-based defaults if not specified
     if args.depth == 1:  # Basic
@@ -956,6 +3927,17 @@ def main():
         num_queries = args.queries if args.queries is not None else 8
         results_per_query = args.results if args.results is not None else 4
     
+    # Reranking searches wider (a full page per query costs the same API call) and scrapes only the top K
+    top_k = None
+    if args.rerank or args.top_k is not None:
+        top_k = args.top_k if args.top_k is not None else RERANK_TOP_K[args.depth]
+        if args.results is None:
+            results_per_query = SEARCH_PAGE_SIZE
+    
+    # Snippets are cheap, so fast mode takes a full page of results per query
+    if args.fast and args.results is None:
+        results_per_query = SEARCH_PAGE_SIZE
+    
     # Print configuration
     print("\n" + "=" * 50)
     print(f"🔍 STARTING DEEP RESEARCH ON: '{args.context}'")
@@ -964,19 +3946,99 @@ def main():
     print(f"   - Research depth: {args.depth} ({'Basic' if args.depth == 1 else 'Detailed' if args.depth == 2 else 'Comprehensive'})")
     print(f"   - Number of search queries: {num_queries}")
     print(f"   - Results per query: {results_per_query}")
-    print(f"   - Site restriction: {args.site if args.site else 'None'}")
+    if args.fast:
+        print(f"   - Documents scraped: none (snippets only){f', top {args.fast_upgrade} in the background' if args.fast_upgrade else ''}")
+    else:
+        print(f"   - Documents scraped: {f'top {top_k} after reranking' if top_k is not None else 'all results'}")
+    print(f"   - Site restriction: {', '.join(sites) if sites else 'None'}")
+    print(f"   - Deadline: {f'{args.deadline:.0f}s' if deadline is not None else 'None'}")
     print(f"   - Verbosity level: {args.verbose}")
     print("=" * 50 + "\n")
     
     try:
-        # Step 1: Generate search queries
-        search_queries = generate_search_queries(args.context, num_queries)
+        routes = parse_model_routes(args.route)
+    except ValueError as e:
+        parser.error(str(e))
+    response_cache = None
+    if args.llm_cache:
+        response_cache = ResponseCache(max_bytes=int(args.llm_cache_max_mb * 1024 * 1024), ttl=args.llm_cache_ttl)
+    configure_model_router(routes, FakeModelBackend() if args.model_backend == "fake" else GeminiBackend(),
+                           cache=response_cache)
+    
+    configure_domain_health(enabled=not args.no_domain_health, hedge=not args.no_hedge)
+    configure_http_session(
+        per_host_connections=args.per_host_connections,
+        connect_retries=args.connect_retries,
+        http2=args.http2,
+    )
+    
+    research_data = None
+    summarizer = None
+    upgrade = None
+    try:
+        incremental = IncrementalState(args.context) if args.incremental else None
+        summarizer = SourceSummarizer(args.context, deadline=deadline) if args.summarize else None
         
-        # Step 2: Execute research process
-        research_data = execute_research(search_queries, results_per_query, args.site)
+        if args.from_corpus:
+            # Steps 1-2 were done by an earlier run: load its corpus instead of searching and scraping
+            research_data, corpus_header = load_corpus(args.from_corpus)
+            if corpus_header.get("topic") and corpus_header["topic"] != args.context:
+                print(f"[Corpus] Note: corpus was collected for '{corpus_header['topic']}'")
+            search_queries = [query for query, _ in research_data.queries()]
+            if incremental is not None:
+                # The corpus documents become this run's documents in the stored state
+                incremental.register_documents(research_data)
+            if summarizer is not None:
+                for record in research_data.records():
+                    summarizer.submit(record, research_data.get_content(record))
+        else:
+            # Step 1: Generate search queries (recurring runs reuse the stored queries so results are comparable)
+            if incremental is not None and len(incremental.queries) >= num_queries:
+                search_queries = incremental.queries[:num_queries]
+                print(f"[Incremental] Reusing {len(search_queries)} search queries from the previous run")
+            else:
+                if deadline is not None:
+                    deadline.begin_stage("queries", DEADLINE_STAGE_FRACTIONS["queries"])
+                search_queries = generate_search_queries(args.context, num_queries,
+                                                         deadline=deadline.stage_end if deadline is not None else None)
+            
+            # Step 2: Execute research process
+            if deadline is not None:
+                deadline.begin_stage("research", DEADLINE_STAGE_FRACTIONS["research"])
+            if args.fast:
+                research_data = search_snippets(search_queries, results_per_query, sites, deadline=deadline)
+            else:
+                research_data = execute_research(search_queries, results_per_query, sites,
+                                                 summarizer=summarizer, incremental=incremental,
+                                                 task_queue=ScrapeTaskQueue(args.queue) if args.queue else None,
+                                                 research_topic=args.context, top_k=top_k, deadline=deadline)
+            if domain_health is not None:
+                domain_health.save()
+        
+        if args.save_corpus:
+            save_corpus(research_data, args.save_corpus, args.context)
+        upgrade = SourceUpgrade(args.context, research_data, args.fast_upgrade, deadline) if args.fast_upgrade else None
+        summaries = None
+        if summarizer is not None:
+            if deadline is not None:
+                deadline.begin_stage("summaries", DEADLINE_STAGE_FRACTIONS["summaries"])
+            summaries = summarizer.results(timeout=deadline.stage_remaining() if deadline is not None else None)
+            summarizer.close()
         
         # Step 3: Synthesize research into a report
-        report = synthesize_report(args.context, research_data, args.depth)
+        if deadline is not None:
+            deadline.begin_stage("synthesis", DEADLINE_STAGE_FRACTIONS["synthesis"])
+        if args.fast:
+            report = synthesize_brief(args.context, research_data, deadline=deadline)
+        else:
+            report = synthesize_report(args.context, research_data, args.depth, summaries=summaries,
+                                       incremental=incremental, deadline=deadline)
+        if deadline is not None:
+            report = report.rstrip("\n") + "\n\n" + deadline.metadata_section()
+        if incremental is not None:
+            print(f"[Incremental] Report parts: {incremental.stats['sections_reused']} reused, "
+                  f"{incremental.stats['sections_generated']} generated")
+            incremental.save(research_data, search_queries)
         
         # Print report
         print("\n" + "=" * 50)
@@ -990,6 +4052,28 @@ def main():
             f.write(report)
         print(f"\nReport saved to: {filename}")
         
+        # The brief is out; now write the fuller report from the sources scraped in the background
+        if upgrade is not None:
+            full_report = upgrade.report()
+            if full_report:
+                full_filename = filename[:-len(".md")] + "_full.md"
+                with open(full_filename, "w", encoding="utf-8") as f:
+                    f.write(full_report)
+                print(f"Full report from {args.fast_upgrade} scraped sources saved to: {full_filename}")
+        
+        http_stats = get_http_session_stats()
+        print(f"[HttpSession] {http_stats['requests']} requests over {http_stats['connections']} connections "
+              f"({http_stats['reused']} reused, {http_stats['reuse_rate']:.0%} reuse rate"
+              f"{', HTTP/2' if http_stats['http2'] else ''})")
+        for model_name, stats in model_router.get_stats().items():
+            print(f"[ModelRouter] {model_name}: {stats['calls']} calls, {stats['errors']} errors, "
+                  f"avg latency {stats['avg_latency']:.1f}s")
+        if response_cache is not None:
+            cache_stats = response_cache.get_stats()
+            print(f"[ResponseCache] {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['saved_seconds']:.1f}s of model time saved; "
+                  f"{cache_stats['entries']} entries, {cache_stats['bytes'] / (1024 * 1024):.1f} MB")
+        
         return report
     
     except Exception as e:
@@ -997,6 +4081,15 @@ def main():
         import traceback
         traceback.print_exc()
         return None
+    finally:
+        # Stops background summaries and scrapes, and releases the spill file (and any
+        # mapped corpus), on failure as well as success
+        if summarizer is not None:
+            summarizer.close()
+        if upgrade is not None:
+            upgrade.close()
+        if research_data is not None:
+            research_data.close()
 
 if __name__ == "__main__":
     main() 
@@ -0,0 +1,27 @@
+"""
+Shared pytest setup.
+
+gemini_research validates its API keys at import time, so dummy keys are set
+before any test module imports it. No test makes a real API call.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("GOOGLE_SEARCH_API_KEY", "test-key")
+os.environ.setdefault("GOOGLE_CSE_ID", "test-cse")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import gemini_research  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restore_model_router():
+    """Tests may replace the module-level router; put the original back afterwards."""
+    router = gemini_research.model_router
+    yield
+    gemini_research.model_router = router
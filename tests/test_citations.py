@@ -0,0 +1,61 @@
+"""Tests for resolving in-text citations to source records."""
+
+import pytest
+
+import gemini_research as gr
+
+
+@pytest.fixture
+def sources():
+    return [
+        gr.SourceRecord("https://www.nature.com/articles/qc1", "Error correction milestones in superconducting qubits", date="2024-03-01"),
+        gr.SourceRecord("https://www.science.org/doi/10.1126/qc2", "Photonic quantum advantage revisited", date="2023-06-10"),
+        gr.SourceRecord("https://research.google/pubs/willow", "Willow chip benchmark results", date="2024-12-09"),
+        gr.SourceRecord("https://arxiv.org/abs/2401.00001", "Surface code thresholds under biased noise", date="2024-01-02"),
+        gr.SourceRecord("https://www.technologyreview.com/2024/qc", "The quantum industry's reality check", date="2024-05-20"),
+    ]
+
+
+@pytest.fixture
+def resolver(sources):
+    return gr.CitationResolver(sources)
+
+
+def _urls(records):
+    return [record.url for record in records]
+
+
+def test_source_numbers(resolver, sources):
+    text = "Qubits improved (Source 2). Both Sources 1 and 4 agree; see also [Source 9]."
+    assert _urls(resolver.resolve(text)) == [sources[1].url, sources[0].url, sources[3].url]
+
+
+def test_bracketed_and_parenthetical_name_year(resolver, sources):
+    assert _urls(resolver.resolve("Thresholds fell [Surface code thresholds, 2024].")) == [sources[3].url]
+    assert _urls(resolver.resolve("Willow was announced (Willow chip benchmark results, 2024).")) == [sources[2].url]
+
+
+def test_site_name_and_domain_citations(resolver, sources):
+    assert _urls(resolver.resolve("As reported [Nature, 2024].")) == [sources[0].url]
+    assert _urls(resolver.resolve("As reported [Nature Journal, 2024].")) == [sources[0].url]
+    assert _urls(resolver.resolve("See [arxiv.org, 2024].")) == [sources[3].url]
+    assert _urls(resolver.resolve("See [MIT Technology Review, 2024].")) == [sources[4].url]
+
+
+def test_domain_and_url_mentions(resolver, sources):
+    assert _urls(resolver.resolve("Preprints on arxiv.org suggest otherwise.")) == [sources[3].url]
+    assert _urls(resolver.resolve("Details: https://research.google/pubs/willow")) == [sources[2].url]
+
+
+@pytest.mark.parametrize("citation", ["[Computer Science Review, 2023]", "[Quantum Research Quarterly, 2024]",
+                                      "(Data Science Weekly, 2023)"])
+def test_site_label_inside_another_name_does_not_match(resolver, citation):
+    assert resolver.resolve(f"A claim {citation}.") == []
+
+
+def test_references_fall_back_to_all_sources(resolver, sources):
+    references = resolver.build_references("Nothing here is cited.")
+    assert references.count("https://") == len(sources)
+    
+    references = resolver.build_references("Only this one [Nature, 2024].")
+    assert "nature.com" in references and "arxiv.org" not in references
@@ -0,0 +1,97 @@
+"""Round-trip tests for corpus export and import."""
+
+import pytest
+
+import gemini_research as gr
+
+LONG_BODY = "long body sentence. " * 200      # Spilled to disk by the store
+SHORT_BODY = "short body " * 20
+
+
+def _store():
+    store = gr.SourceStore()
+    first = store.add_query("first query")
+    second = store.add_query("second query")
+    a = store.add_search_result(first, {"title": "A", "link": "https://a.org/", "snippet": "sa", "date": "2025-01-02"})
+    b = store.add_search_result(first, {"title": "B", "link": "https://b.org/", "snippet": "sb", "date": ""})
+    store.add_search_result(second, {"title": "A", "link": "https://a.org/", "snippet": "sa", "date": "2025-01-02"})
+    c = store.add_search_result(second, {"title": "C", "link": "https://c.org/", "snippet": "sc", "date": ""})
+    mirror = store.add_search_result(second, {"title": "M", "link": "https://mirror.org/", "snippet": "sm", "date": ""})
+    store.set_content(a, LONG_BODY)
+    store.set_content(b, SHORT_BODY)
+    store.set_content(c, "", "Scraping Error: HTTP 404")
+    store.set_content(mirror, LONG_BODY)
+    return store
+
+
+def _snapshot(store):
+    return (
+        [(query, [record.url for record in records]) for query, records in store.queries()],
+        [(record.url, record.title, record.snippet, record.date, record.error, record.scraped, store.get_content(record))
+         for record in store.records()],
+        store.build_context("topic"),
+    )
+
+
+@pytest.mark.parametrize("suffix", [
+    ".jsonl",
+    ".jsonl.gz",
+    pytest.param(".jsonl.zst", marks=pytest.mark.skipif(gr.zstandard is None, reason="zstandard not installed")),
+])
+def test_round_trip(tmp_path, suffix):
+    path = str(tmp_path / f"corpus{suffix}")
+    with _store() as original:
+        gr.save_corpus(original, path, "topic")
+        expected = _snapshot(original)
+    loaded, header = gr.load_corpus(path)
+    with loaded:
+        assert header["topic"] == "topic"
+        assert _snapshot(loaded) == expected
+        stats = loaded.memory_stats()
+        assert stats["unique_bodies"] == 2
+        if suffix == ".jsonl":
+            # Plain corpora are memory-mapped and bodies decoded on demand
+            assert stats["lazy_bodies"] == 2
+            assert stats["in_memory_chars"] == 0
+
+
+def test_overwriting_the_loaded_corpus(tmp_path):
+    path = str(tmp_path / "corpus.jsonl")
+    with _store() as original:
+        gr.save_corpus(original, path, "topic")
+        expected = _snapshot(original)
+    loaded, _ = gr.load_corpus(path)
+    with loaded:
+        gr.save_corpus(loaded, path, "topic")
+        assert _snapshot(loaded) == expected
+    reloaded, _ = gr.load_corpus(path)
+    with reloaded:
+        assert _snapshot(reloaded) == expected
+    assert [p.name for p in tmp_path.iterdir()] == ["corpus.jsonl"]
+
+
+def test_failed_save_leaves_no_partial_file(tmp_path, monkeypatch):
+    path = tmp_path / "corpus.jsonl"
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(gr, "_write_corpus", fail)
+    with _store() as store, pytest.raises(OSError):
+        gr.save_corpus(store, str(path), "topic")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_incremental_state_keeps_corpus_documents(tmp_path):
+    path = str(tmp_path / "corpus.jsonl")
+    with _store() as original:
+        gr.save_corpus(original, path, "topic")
+    loaded, _ = gr.load_corpus(path)
+    with loaded:
+        state = gr.IncrementalState("topic", cache_dir=str(tmp_path))
+        state.register_documents(loaded)
+        state.save(loaded, ["first query", "second query"])
+
+    state = gr.IncrementalState("topic", cache_dir=str(tmp_path))
+    reused = state.reuse_document({"title": "A", "link": "https://a.org/", "snippet": "sa", "date": "2025-01-02"})
+    assert reused is not None and reused["content"] == LONG_BODY
@@ -0,0 +1,91 @@
+"""Tests that a run deadline bounds whole fetches and model synthesis."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import gemini_research as gr
+
+
+class _TrickleHandler(BaseHTTPRequestHandler):
+    """Answers at once, then sends the body a byte at a time over 3s so no single read times out."""
+    length = 30
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(self.length))
+        self.end_headers()
+        try:
+            for _ in range(self.length):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            pass
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def trickle_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TrickleHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_http_session():
+    gr.configure_http_session()
+    yield
+
+
+def test_deadline_bounds_a_slow_body(trickle_server):
+    start = time.time()
+    with pytest.raises(requests.exceptions.Timeout):
+        gr.http_get(trickle_server, timeout=30, deadline=start + 1.0)
+    assert time.time() - start < 2.0
+
+
+def test_deadline_bounds_a_hedged_fetch(trickle_server):
+    start = time.time()
+    with pytest.raises(requests.exceptions.Timeout):
+        gr._hedged_get(trickle_server, {}, timeout=30, hedge_after=0.3, deadline=start + 1.0)
+    assert time.time() - start < 2.0
+
+
+def test_without_a_deadline_the_body_is_read_in_full(trickle_server):
+    response = gr.http_get(trickle_server, timeout=5)
+    assert response.content == b"x" * _TrickleHandler.length
+
+
+@pytest.mark.parametrize("retries", [0, 2, 4])
+def test_connect_retries_fit_in_the_remaining_time(retries):
+    gr.configure_http_session(connect_retries=retries)
+    remaining = 10.0
+    backoff = sum(gr.HTTP_RETRY_BACKOFF * 2 ** (n - 1) for n in range(2, retries + 1))
+    assert (retries + 1) * gr._connect_timeout(remaining) + backoff <= remaining + 1e-9
+
+
+def test_no_time_for_a_report_builds_an_extractive_one():
+    backend = gr.FakeModelBackend()
+    gr.model_router = gr.ModelRouter(gr.DEFAULT_MODEL_ROUTES, backend)
+    store = gr.SourceStore()
+    query_id = store.add_query("query")
+    record = store.add_search_result(query_id, {"title": "Source", "link": "https://a.org/", "snippet": "a snippet", "date": ""})
+    store.set_content(record, "Scraped body text. " * 20)
+    deadline = gr.RunDeadline(60)
+    deadline.begin_stage("synthesis", 0.1)   # Less than the expected duration of a report call
+    with store:
+        report = gr.synthesize_report("topic", store, 1, deadline=deadline)
+    assert backend.calls == []
+    assert "## Key Sources" in report
+    assert any("extractive report" in cut for cut in deadline.cuts)
@@ -0,0 +1,95 @@
+"""Tests for per-domain health tracking against a local server."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import gemini_research as gr
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        segment = self.path.strip("/").split("/")[0]
+        status = 200 if segment == "article" else int(segment)
+        body = b"<html><body>status page</body></html>"
+        if segment == "article":
+            paragraphs = "".join(f"<p>Paragraph {i} of a readable article about the topic.</p>" for i in range(20))
+            body = f"<html><body><article>{paragraphs}</article></body></html>".encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def status_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StatusHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def in_memory_domain_health():
+    previous = (gr.domain_health, gr.scrape_hedging_enabled)
+    gr.configure_http_session()
+    gr.configure_domain_health(enabled=True, hedge=False, path=None)
+    yield gr.domain_health
+    gr.domain_health, gr.scrape_hedging_enabled = previous
+
+
+def test_client_errors_do_not_open_breaker(status_server):
+    for attempt in range(gr.DOMAIN_BREAKER_FAILURES + 1):
+        result = gr.scrape_web_content(f"{status_server}/404/{attempt}")
+        assert "HTTP 404" in result["error"]
+    assert gr.domain_health.get_stats("127.0.0.1")["breaker_open"] is False
+    assert gr.domain_health.allow("127.0.0.1")
+
+
+def test_server_errors_open_breaker(status_server):
+    for attempt in range(gr.DOMAIN_BREAKER_FAILURES):
+        gr.scrape_web_content(f"{status_server}/503/{attempt}")
+    assert not gr.domain_health.allow("127.0.0.1")
+    assert "circuit breaker" in gr.scrape_web_content(f"{status_server}/200/")["error"]
+
+
+def test_get_stats_does_not_create_entries():
+    stats = gr.domain_health.get_stats("unknown.example")
+    assert stats["samples"] == 0
+    assert "unknown.example" not in gr.domain_health._domains
+
+
+@pytest.mark.parametrize("path", ["403", "200"])   # A 403, or a page with no extractable text
+def test_blocked_fetches_open_breaker(status_server, path):
+    for attempt in range(gr.DOMAIN_BREAKER_BLOCKED - 1):
+        gr.scrape_web_content(f"{status_server}/{path}/{attempt}")
+    assert gr.domain_health.allow("127.0.0.1")
+    assert gr.domain_health.get_stats("127.0.0.1")["failure_rate"] == 0.0
+    gr.scrape_web_content(f"{status_server}/{path}/last")
+    assert not gr.domain_health.allow("127.0.0.1")
+
+
+def test_readable_page_resets_blocked_count(status_server):
+    for attempt in range(gr.DOMAIN_BREAKER_BLOCKED - 1):
+        gr.scrape_web_content(f"{status_server}/403/{attempt}")
+    assert "content" in gr.scrape_web_content(f"{status_server}/article/")
+    assert gr.domain_health.get_stats("127.0.0.1")["consecutive_blocked"] == 0
+    for attempt in range(gr.DOMAIN_BREAKER_BLOCKED - 1):
+        gr.scrape_web_content(f"{status_server}/403/again-{attempt}")
+    assert gr.domain_health.allow("127.0.0.1")
+
+
+def test_history_without_blocked_count_still_loads(tmp_path):
+    path = tmp_path / "domain_health.json"
+    path.write_text('{"old.org": {"latencies": [0.5], "successes": 1, "failures": 0, '
+                    '"consecutive_failures": 0, "breaker_open_until": 0.0}}')
+    tracker = gr.DomainHealthTracker(str(path))
+    tracker.record("old.org", 0.4, success=True, blocked=True)
+    assert tracker.get_stats("old.org")["consecutive_blocked"] == 1
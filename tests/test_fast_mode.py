@@ -0,0 +1,28 @@
+"""Tests for the snippet-only fast mode."""
+
+import gemini_research as gr
+
+
+def test_upgrade_scrapes_each_url_once(monkeypatch):
+    scraped = []
+    
+    def fake_scrape(url, max_timeout=None):
+        scraped.append(url)
+        return {"content": f"Body of {url}. " * 20}
+    
+    monkeypatch.setattr(gr, "scrape_web_content", fake_scrape)
+    store = gr.SourceStore()
+    # One source is found by every query; asking for more sources than there are must not scrape it twice
+    for query in ("topic overview", "topic details", "topic history"):
+        query_id = store.add_query(query)
+        store.add_search_result(query_id, {"title": "Topic", "link": "https://a.org/topic", "snippet": "topic", "date": ""})
+        store.add_search_result(query_id, {"title": f"Other {query}", "link": f"https://b.org/{query.split()[1]}",
+                                           "snippet": "other", "date": ""})
+    with store:
+        upgrade = gr.SourceUpgrade("topic", store, top_n=6)
+        for _, future in upgrade._futures:
+            future.result()
+        upgrade.close()
+    assert len(scraped) == 4
+    assert len(set(scraped)) == 4
+    assert "https://a.org/topic" in scraped
@@ -0,0 +1,116 @@
+"""Tests for Custom Search requests."""
+
+import pytest
+
+import gemini_research as gr
+
+
+class _FakeRequest:
+    def __init__(self, calls, params):
+        self.calls = calls
+        self.params = params
+    
+    def execute(self, http=None):
+        self.calls.append((self.params, http))
+        return {"items": []}
+
+
+class _FakeService:
+    def __init__(self):
+        self.calls = []
+    
+    def cse(self):
+        return self
+    
+    def list(self, **params):
+        return _FakeRequest(self.calls, params)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    fake = _FakeService()
+    monkeypatch.setattr(gr, "_get_search_service", lambda: fake)
+    return fake
+
+
+def test_search_request_timeout_is_capped_by_the_deadline(service):
+    gr._fetch_search_page({"q": "query"}, 1, 10, deadline=gr.time.time() + 2)
+    (params, http), = service.calls
+    assert params["start"] == 1 and params["num"] == 10
+    assert 0 < http.timeout <= 2
+
+
+def test_search_request_after_the_deadline_is_not_sent(service):
+    with pytest.raises(TimeoutError):
+        gr._fetch_search_page({"q": "query"}, 1, 10, deadline=gr.time.time() - 1)
+    assert service.calls == []
+
+
+def _page(start, num, total, links=None):
+    """A Custom Search response for results start..start+num-1 out of total."""
+    end = min(start + num - 1, total)
+    links = links or [f"https://r{rank}.org/" for rank in range(start, end + 1)]
+    response = {"items": [{"title": link, "link": link, "snippet": ""} for link in links],
+                "searchInformation": {"totalResults": str(total)}, "queries": {}}
+    if end < total:
+        response["queries"]["nextPage"] = [{"startIndex": end + 1}]
+    return response
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Stubs page fetches; set pages.total, pages.overrides[start] and pages.failing to shape the results."""
+    class Pages:
+        total = 100
+        overrides = {}
+        failing = set()
+        requested = []
+    
+    def fetch(search_params, start, num, deadline=None):
+        Pages.requested.append((start, num))
+        if start in Pages.failing:
+            raise RuntimeError("quota")
+        if start in Pages.overrides:
+            return _page(start, num, Pages.total, Pages.overrides[start])
+        return _page(start, num, Pages.total)
+    
+    monkeypatch.setattr(gr, "_fetch_search_page", fetch)
+    return Pages
+
+
+def test_pages_are_merged_in_rank_order(pages):
+    results = gr.google_search("query", num_results=25)
+    assert [result["link"] for result in results] == [f"https://r{rank}.org/" for rank in range(1, 26)]
+    assert sorted(pages.requested) == [(1, 10), (11, 10), (21, 5)]
+
+
+def test_duplicate_links_across_pages_are_dropped(pages):
+    pages.overrides[11] = ["https://r3.org/"] + [f"https://s{rank}.org/" for rank in range(12, 21)]
+    links = [result["link"] for result in gr.google_search("query", num_results=20)]
+    assert links.count("https://r3.org/") == 1
+    assert len(links) == 19
+
+
+def test_no_requests_beyond_the_reported_result_count(pages):
+    pages.total = 15
+    results = gr.google_search("query", num_results=100)
+    assert len(results) == 15
+    assert sorted(pages.requested) == [(1, 10), (11, 5)]
+
+
+def test_short_first_page_stops_paging(pages):
+    pages.total = 7
+    assert len(gr.google_search("query", num_results=50)) == 7
+    assert pages.requested == [(1, 10)]
+
+
+def test_failed_later_page_keeps_earlier_results(pages):
+    pages.failing = {21}
+    results = gr.google_search("query", num_results=40)
+    assert [result["link"] for result in results] == [f"https://r{rank}.org/" for rank in range(1, 21)]
+
+
+def test_failed_first_page_returns_nothing(pages):
+    pages.failing = {1}
+    assert gr.google_search("query", num_results=30) == []
+    assert pages.requested == [(1, 10)]
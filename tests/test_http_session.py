@@ -0,0 +1,56 @@
+"""Tests for the pooled HTTP session against a local server."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import gemini_research as gr
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    delay = 2.0
+    
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = b"<html><body>late</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_http_session():
+    gr.configure_http_session()
+    previous = gr.domain_health
+    gr.domain_health = None
+    yield
+    gr.domain_health = previous
+
+
+def test_read_timeout_is_raised_as_timeout(slow_server):
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        gr.http_get(slow_server, timeout=0.5)
+
+
+def test_scraper_reports_read_timeout(slow_server):
+    result = gr._fetch_and_extract(slow_server, timeout=0.5, hedge_after=None)
+    assert "timed out" in result["error"]
+    assert result["latency"] == 0.5
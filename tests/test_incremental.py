@@ -0,0 +1,65 @@
+"""Tests for per-section reuse in incremental synthesis."""
+
+import gemini_research as gr
+
+
+def _store(bodies):
+    store = gr.SourceStore()
+    query_id = store.add_query("topic overview")
+    for number, body in enumerate(bodies, start=1):
+        record = store.add_search_result(query_id, {
+            "title": f"Article {number}", "link": f"https://site{number}.org/a", "snippet": "s", "date": "2025",
+        })
+        store.set_content(record, body)
+    return store
+
+
+def _responder(model_name, prompt):
+    # The first content section cites Source 2; every other part cites Source 1
+    if 'Write section 3:' in prompt:
+        return "Section text citing [Source 2]."
+    return "Text citing [Source 1]."
+
+
+def _run(tmp_path, bodies):
+    backend = gr.FakeModelBackend(responder=_responder)
+    gr.configure_model_router(None, backend)
+    incremental = gr.IncrementalState("incremental topic", cache_dir=str(tmp_path))
+    store = _store(bodies)
+    try:
+        gr.synthesize_report("incremental topic", store, 2, incremental=incremental)
+        incremental.save(store, ["topic overview"])
+    finally:
+        store.close()
+    return backend, incremental
+
+
+def test_only_sections_citing_changed_sources_are_regenerated(tmp_path):
+    bodies = ["alpha " * 100, "beta " * 100, "gamma " * 100]
+    first, state = _run(tmp_path, bodies)
+    assert state.stats["sections_reused"] == 0
+    generated = state.stats["sections_generated"]
+    
+    second, state = _run(tmp_path, bodies)
+    assert second.calls == []
+    assert state.stats["sections_reused"] == generated
+    
+    # Source 2 changes: only the section that cites it is written again
+    third, state = _run(tmp_path, [bodies[0], "changed " * 100, bodies[2]])
+    assert len(third.calls) == 1
+    assert state.stats["sections_generated"] == 1
+
+
+def test_changed_model_route_regenerates(tmp_path):
+    bodies = ["alpha " * 100, "beta " * 100]
+    _run(tmp_path, bodies)
+    backend = gr.FakeModelBackend(responder=_responder)
+    routes = gr.parse_model_routes(["sections=other-model"])
+    gr.configure_model_router(routes, backend)
+    incremental = gr.IncrementalState("incremental topic", cache_dir=str(tmp_path))
+    store = _store(bodies)
+    try:
+        gr.synthesize_report("incremental topic", store, 2, incremental=incremental)
+    finally:
+        store.close()
+    assert backend.calls and set(backend.calls) == {"other-model"}
@@ -0,0 +1,57 @@
+"""Tests for ModelRouter using the offline FakeModelBackend."""
+
+import pytest
+
+import gemini_research as gr
+
+ROUTES = {
+    "queries": ["fast", "strong"],
+    "report": ["strong", "fast"],
+}
+CONFIG = {"temperature": 0.2}
+
+
+def test_unknown_stage_raises():
+    router = gr.ModelRouter(ROUTES, gr.FakeModelBackend())
+    with pytest.raises(ValueError):
+        router.generate("sectoins", "prompt", CONFIG)
+
+
+def test_slow_stage_does_not_demote_model_in_other_stages():
+    router = gr.ModelRouter(ROUTES, gr.FakeModelBackend(), timeouts={"queries": 10, "report": 100})
+    # 'strong' is slow for queries but well within the report timeout
+    for _ in range(gr.MODEL_MIN_SAMPLES):
+        router._record("strong", "report", 9.0, failed=False)
+        router._record("strong", "queries", 9.0, failed=False)
+    assert router.candidates("report")[0] == "strong"
+    assert router.candidates("queries") == ["fast", "strong"]
+    
+    stats = router.get_stats()["strong"]
+    assert stats["calls"] == 2 * gr.MODEL_MIN_SAMPLES
+    assert set(stats["stages"]) == {"report", "queries"}
+
+
+def test_falls_back_when_primary_fails():
+    backend = gr.FakeModelBackend(fail_models=("strong",))
+    router = gr.ModelRouter(ROUTES, backend)
+    text = router.generate("report", "prompt", CONFIG)
+    assert "fast" in text
+    assert backend.calls == ["strong", "fast"]
+    assert router.get_stats()["strong"]["errors"] == 1
+
+
+def test_failing_primary_is_demoted():
+    backend = gr.FakeModelBackend(fail_models=("strong",))
+    router = gr.ModelRouter(ROUTES, backend)
+    for _ in range(gr.MODEL_MIN_SAMPLES):
+        router.generate("report", "prompt", CONFIG)
+    assert router.candidates("report") == ["fast", "strong"]
+    backend.calls.clear()
+    router.generate("report", "prompt", CONFIG)
+    assert backend.calls == ["fast"]
+
+
+def test_raises_when_every_model_fails():
+    router = gr.ModelRouter(ROUTES, gr.FakeModelBackend(fail_models=("strong", "fast")))
+    with pytest.raises(RuntimeError):
+        router.generate("report", "prompt", CONFIG)
@@ -0,0 +1,77 @@
+"""Behaviour tests for reranking search results before scraping."""
+
+import time
+
+import gemini_research as gr
+
+TOPIC = "quantum error correction"
+
+
+def _candidate(link, title, snippet="", date="", query=TOPIC, rank=0):
+    return {"query": query, "rank": rank, "result": {"title": title, "link": link, "snippet": snippet, "date": date}}
+
+
+def _links(selected):
+    return [candidate["result"]["link"] for candidate in selected]
+
+
+def test_returns_exactly_top_k_best_first():
+    candidates = [_candidate(f"https://site{i}.org/", f"Quantum error correction study {i}", rank=i) for i in range(8)]
+    selected = gr.rerank_candidates(TOPIC, candidates, 3)
+    assert len(selected) == 3
+    scores = [candidate["score"] for candidate in selected]
+    assert scores == sorted(scores, reverse=True)
+    assert len(gr.rerank_candidates(TOPIC, candidates[:2], 5)) == 2
+    assert gr.rerank_candidates(TOPIC, [], 3) == []
+
+
+def test_relevant_title_beats_unrelated_title():
+    candidates = [
+        _candidate("https://a.org/cooking", "Ten easy pasta recipes", "Dinner ideas for the week"),
+        _candidate("https://b.org/qec", "Advances in quantum error correction", "Surface codes and logical qubits", rank=1),
+    ]
+    assert _links(gr.rerank_candidates(TOPIC, candidates, 1)) == ["https://b.org/qec"]
+
+
+def test_stale_forum_result_ranks_below_fresh_journal_result():
+    this_year = time.localtime().tm_year
+    candidates = [
+        _candidate("https://www.reddit.com/r/QuantumComputing/comments/1", "Quantum error correction question",
+                   "Anyone know about error correction?", date="2015-01-01"),
+        _candidate("https://www.nature.com/articles/qec", "Quantum error correction below threshold",
+                   "Logical error rates fall as codes grow", date=f"{this_year}-01-15", rank=1),
+    ]
+    selected = gr.rerank_candidates(TOPIC, candidates, 2)
+    assert _links(selected) == ["https://www.nature.com/articles/qec",
+                                "https://www.reddit.com/r/QuantumComputing/comments/1"]
+
+
+def test_recency_decays_with_age():
+    this_year = time.localtime().tm_year
+    assert gr._recency_score(f"{this_year}-01") > gr._recency_score(f"{this_year - 2}-01") > gr._recency_score("2001-01")
+    assert gr._recency_score("") == 0.3
+
+
+def test_domain_priors():
+    assert gr._domain_prior("https://arxiv.org/abs/1") > gr._domain_prior("https://example.com/post") == 0.0
+    assert gr._domain_prior("https://physics.mit.edu/qec") > 0
+    assert gr._domain_prior("https://www.quora.com/What-is-QEC") < 0
+    assert gr._domain_prior("https://example.com/forums/qec") < 0
+
+
+def test_near_duplicate_is_pushed_down():
+    title = "Quantum error correction reaches a new milestone"
+    snippet = "Researchers demonstrate logical qubits with lower error rates"
+    candidates = [
+        _candidate("https://a.org/news", title, snippet),
+        _candidate("https://b.org/copy", title, snippet, rank=1),
+        _candidate("https://c.org/other", "Decoders for quantum error correction codes", "Fast decoding algorithms", rank=2),
+    ]
+    assert _links(gr.rerank_candidates(TOPIC, candidates, 2)) == ["https://a.org/news", "https://c.org/other"]
+
+
+def test_same_domain_results_are_spread_out():
+    candidates = [_candidate(f"https://big.org/qec/{i}", f"Quantum error correction part {i}", rank=i) for i in range(3)]
+    candidates.append(_candidate("https://small.org/qec", "Quantum error correction overview", rank=3))
+    selected = _links(gr.rerank_candidates(TOPIC, candidates, 2))
+    assert "https://small.org/qec" in selected
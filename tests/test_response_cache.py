@@ -0,0 +1,70 @@
+"""Tests for the persistent model response cache."""
+
+import pytest
+
+import gemini_research as gr
+
+CONFIG = {"temperature": 0.2}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return gr.ResponseCache(str(tmp_path / "responses.sqlite"))
+
+
+def test_miss_then_hit(cache):
+    key = gr.ResponseCache.key("Backend", "model", CONFIG, "prompt")
+    assert cache.get(key) is None
+    cache.put(key, "model", "answer", latency=2.5)
+    assert cache.get(key) == "answer"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["saved_seconds"] == 2.5
+
+
+def test_key_covers_model_config_and_prompt():
+    key = gr.ResponseCache.key("Backend", "model", CONFIG, "prompt")
+    assert key == gr.ResponseCache.key("Backend", "model", {"temperature": 0.2}, "prompt")
+    assert key != gr.ResponseCache.key("Backend", "other", CONFIG, "prompt")
+    assert key != gr.ResponseCache.key("Backend", "model", {"temperature": 0.7}, "prompt")
+    assert key != gr.ResponseCache.key("Backend", "model", CONFIG, "prompt 2")
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    cache = gr.ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(gr.time, "time", lambda: now)
+    cache.put("key", "model", "answer", latency=1.0)
+    now += 59
+    assert cache.get("key") == "answer"
+    now += 2
+    assert cache.get("key") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_entries_expire_by_default(cache):
+    assert cache.ttl == gr.LLM_CACHE_TTL
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    cache = gr.ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=25)
+    now = 1_000_000.0
+    monkeypatch.setattr(gr.time, "time", lambda: now)
+    for name in ("a", "b"):
+        now += 1
+        cache.put(name, "model", "x" * 10, latency=1.0)
+    now += 1
+    assert cache.get("a") is not None    # 'b' is now the least recently used
+    now += 1
+    cache.put("c", "model", "x" * 10, latency=1.0)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.get_stats()["bytes"] == 20
+
+
+def test_router_answers_repeated_requests_from_cache(cache):
+    backend = gr.FakeModelBackend()
+    router = gr.ModelRouter({"report": ["strong"]}, backend, cache=cache)
+    first = router.generate("report", "prompt", CONFIG)
+    assert router.generate("report", "prompt", CONFIG) == first
+    assert backend.calls == ["strong"]
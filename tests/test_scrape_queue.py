@@ -0,0 +1,132 @@
+"""Tests for the SQLite scrape task queue used in worker mode."""
+
+import time
+
+import pytest
+
+import gemini_research as gr
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+
+def _worker(queue_path, lease_seconds=60, max_attempts=3):
+    return gr.ScrapeTaskQueue(queue_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+
+
+def test_claim_complete_and_collect(queue_path):
+    coordinator = _worker(queue_path)
+    coordinator.enqueue("job", "https://a.org/", 0)
+    coordinator.enqueue("job", "https://a.org/", 0)  # duplicate is ignored
+    coordinator.enqueue("other", "https://b.org/", 1)
+    
+    worker = _worker(queue_path)
+    task = worker.claim("job")
+    assert task["url"] == "https://a.org/"
+    assert worker.claim("job") is None
+    assert worker.complete(task["id"], {"content": "body", "error": ""})
+    
+    finished = coordinator.collect("job", set())
+    assert [(item["url"], item["status"], item["result"]["content"]) for item in finished] == [("https://a.org/", "done", "body")]
+    assert coordinator.outstanding("job") == 0
+    assert coordinator.outstanding("other") == 1
+
+
+def test_expired_lease_is_reclaimed_and_stale_completion_rejected(queue_path):
+    coordinator = _worker(queue_path)
+    coordinator.enqueue("job", "https://slow.org/", 0)
+    first = _worker(queue_path, lease_seconds=0.1)
+    second = _worker(queue_path, lease_seconds=60)
+    
+    task = first.claim()
+    assert second.claim() is None
+    time.sleep(0.2)
+    reclaimed = second.claim()
+    assert reclaimed["id"] == task["id"]
+    
+    assert not first.complete(task["id"], {"content": "late", "error": ""})
+    assert not first.renew(task["id"])
+    assert second.complete(task["id"], {"content": "fresh", "error": ""})
+    assert coordinator.collect("job", set())[0]["result"]["content"] == "fresh"
+
+
+def test_renewed_lease_is_not_reclaimed(queue_path):
+    coordinator = _worker(queue_path)
+    coordinator.enqueue("job", "https://slow.org/", 0)
+    holder = _worker(queue_path, lease_seconds=0.3)
+    other = _worker(queue_path)
+    
+    task = holder.claim()
+    for _ in range(3):
+        time.sleep(0.15)
+        assert holder.renew(task["id"])
+        assert other.claim() is None
+    assert holder.complete(task["id"], {"content": "done", "error": ""})
+
+
+def test_task_abandoned_after_max_attempts(queue_path):
+    coordinator = _worker(queue_path)
+    coordinator.enqueue("job", "https://dead.org/", 0)
+    worker = _worker(queue_path, lease_seconds=0.05, max_attempts=2)
+    
+    assert worker.claim() is not None
+    time.sleep(0.1)
+    assert worker.claim() is not None
+    time.sleep(0.1)
+    assert worker.claim() is None
+    
+    finished = coordinator.collect("job", set())
+    assert finished[0]["status"] == "failed"
+    assert "abandoned" in finished[0]["result"]["error"]
+
+
+def test_run_scrape_task_renews_lease_during_slow_scrape(queue_path, monkeypatch):
+    coordinator = _worker(queue_path)
+    coordinator.enqueue("job", "https://slow.org/", 0)
+    worker = _worker(queue_path, lease_seconds=0.3)
+    rival = _worker(queue_path)
+    claims = []
+    
+    def slow_scrape(url, max_timeout=None):
+        for _ in range(4):
+            time.sleep(0.2)
+            claims.append(rival.claim())
+        return {"content": "body"}
+    
+    monkeypatch.setattr(gr, "scrape_web_content", slow_scrape)
+    gr.run_scrape_task(worker, worker.claim())
+    assert claims == [None] * 4
+    assert coordinator.collect("job", set())[0]["result"]["content"] == "body"
+
+
+def test_job_settings_round_trip_and_purge(queue_path):
+    coordinator = _worker(queue_path)
+    settings = dict(gr.scrape_settings(), per_host_connections=7)
+    coordinator.set_job_settings("job", settings)
+    assert _worker(queue_path).job_settings("job") == settings
+    coordinator.purge("job")
+    assert coordinator.job_settings("job") == {}
+
+
+def test_coordinator_scrapes_are_bound_by_the_deadline(queue_path, monkeypatch):
+    timeouts = []
+    
+    def scrape(url, max_timeout=None):
+        timeouts.append(max_timeout)
+        return {"content": "Body text. " * 20}
+    
+    monkeypatch.setattr(gr, "scrape_web_content", scrape)
+    coordinator = _worker(queue_path)
+    store = gr.SourceStore()
+    query_id = store.add_query("query")
+    store.add_search_result(query_id, {"title": "A", "link": "https://a.org/", "snippet": "", "date": ""})
+    coordinator.enqueue("job", "https://a.org/", query_id)
+    deadline = gr.RunDeadline(40)
+    deadline.begin_stage("research", 0.5)
+    with store:
+        gr._collect_queued_results(store, coordinator, "job", {"https://a.org/": ""}, None, deadline)
+        assert store.get_content(store.get_record("https://a.org/"))
+    assert len(timeouts) == 1
+    assert timeouts[0] is not None and timeouts[0] <= deadline.stage_end - deadline.start
@@ -0,0 +1,58 @@
+"""Tests for merging searches across several sites."""
+
+import gemini_research as gr
+
+
+def _fake_search(query, num_results=5, site_search=None, deadline=None):
+    return [{"title": f"{site_search} {rank}", "link": f"https://{site_search}/{rank}", "snippet": "", "date": ""}
+            for rank in range(num_results)]
+
+
+def test_search_sites_splits_results_across_sites(monkeypatch):
+    requested = {}
+    
+    def search(query, num_results=5, site_search=None, deadline=None):
+        requested[site_search] = num_results
+        return _fake_search(query, num_results, site_search)
+    
+    monkeypatch.setattr(gr, "google_search", search)
+    results = gr.search_sites("query", 4, ["a.org", "b.org", "c.org"])
+    assert requested == {"a.org": 2, "b.org": 2, "c.org": 2}
+    links = [result["link"] for result in results]
+    assert len(links) == 4
+    # Every site's top result comes before any second result
+    assert sorted(links[:3]) == ["https://a.org/0", "https://b.org/0", "https://c.org/0"]
+    assert links[3].endswith("/1")
+
+
+def test_every_site_is_kept_when_there_are_more_sites_than_results(monkeypatch):
+    requested = {}
+    
+    def search(query, num_results=5, site_search=None, deadline=None):
+        requested[site_search] = num_results
+        return _fake_search(query, num_results, site_search)
+    
+    monkeypatch.setattr(gr, "google_search", search)
+    sites = [f"s{i}.org" for i in range(10)]
+    results = gr.search_sites("query", 2, sites)
+    assert set(requested.values()) == {1}
+    assert sorted(result["link"] for result in results) == sorted(f"https://{site}/0" for site in sites)
+
+
+def test_tie_order_rotates_between_queries(monkeypatch):
+    monkeypatch.setattr(gr, "google_search", _fake_search)
+    sites = [f"s{i}.org" for i in range(5)]
+    leaders = {gr.search_sites(f"query {i}", 5, sites)[0]["link"] for i in range(20)}
+    assert len(leaders) > 1
+
+
+def test_search_sites_ranks_links_found_on_several_sites_first(monkeypatch):
+    def search(query, num_results=5, site_search=None, deadline=None):
+        results = _fake_search(query, num_results, site_search)
+        results[1]["link"] = "https://shared.org/"
+        return results
+    
+    monkeypatch.setattr(gr, "google_search", search)
+    results = gr.search_sites("query", 3, ["a.org", "b.org"])
+    assert len(results) == 3
+    assert results[0]["link"] == "https://shared.org/"
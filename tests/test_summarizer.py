@@ -0,0 +1,75 @@
+"""Tests for concurrent source summarization."""
+
+import pytest
+
+import gemini_research as gr
+
+ROUTES = dict(gr.DEFAULT_MODEL_ROUTES, summary=["primary", "fallback"])
+BODY = "A long scraped page body about the topic. " * 20
+
+
+@pytest.fixture
+def backend():
+    backend = gr.FakeModelBackend(responder=lambda model_name, prompt: f"- fact from {model_name}")
+    gr.model_router = gr.ModelRouter(ROUTES, backend)
+    return backend
+
+
+def _records(store, *urls, body=BODY):
+    query_id = store.add_query("query")
+    records = []
+    for url in urls:
+        record = store.add_search_result(query_id, {"title": url, "link": url, "snippet": "", "date": ""})
+        store.set_content(record, body)
+        records.append(record)
+    return records
+
+
+def _summarize(tmp_path, store, records):
+    summarizer = gr.SourceSummarizer("topic", cache_dir=str(tmp_path))
+    for record in records:
+        summarizer.submit(record, store.get_content(record))
+    try:
+        return summarizer.results(timeout=10)
+    finally:
+        summarizer.close()
+
+
+def test_identical_bodies_are_summarized_once(tmp_path, backend):
+    with gr.SourceStore() as store:
+        records = _records(store, "https://a.org/", "https://mirror.org/a")
+        summaries = _summarize(tmp_path, store, records)
+    assert summaries == {"https://a.org/": "- fact from primary", "https://mirror.org/a": "- fact from primary"}
+    assert backend.calls == ["primary"]
+
+
+def test_summaries_are_cached_by_content(tmp_path, backend):
+    with gr.SourceStore() as store:
+        _summarize(tmp_path, store, _records(store, "https://a.org/"))
+    with gr.SourceStore() as store:
+        # Same body at a different URL, in a later run
+        summaries = _summarize(tmp_path, store, _records(store, "https://b.org/"))
+    assert summaries == {"https://b.org/": "- fact from primary"}
+    assert backend.calls == ["primary"]
+    with gr.SourceStore() as store:
+        _summarize(tmp_path, store, _records(store, "https://c.org/", body=BODY + "changed"))
+    assert backend.calls == ["primary", "primary"]
+
+
+def test_fallback_summaries_are_not_cached(tmp_path, backend):
+    backend.fail_models = {"primary"}
+    with gr.SourceStore() as store:
+        assert _summarize(tmp_path, store, _records(store, "https://a.org/")) == {"https://a.org/": "- fact from fallback"}
+    backend.fail_models = set()
+    with gr.SourceStore() as store:
+        assert _summarize(tmp_path, store, _records(store, "https://a.org/")) == {"https://a.org/": "- fact from primary"}
+
+
+def test_results_leaves_out_summaries_not_ready_in_time(tmp_path, backend):
+    backend.latency = {"primary": 1.0}
+    with gr.SourceStore() as store:
+        records = _records(store, "https://slow.org/")
+        summarizer = gr.SourceSummarizer("topic", cache_dir=str(tmp_path))
+        summarizer.submit(records[0], store.get_content(records[0]))
+        assert summarizer.results(timeout=0.1) == {}
+        summarizer.close()